@@ -0,0 +1,165 @@
+"""End-to-end LeadProcessor benchmark against local mock providers
+
+Generates synthetic Retran exports at several scales, points every
+provider at a local mock server (Hunter, Apollo, Mailchimp, Twilio,
+Facebook) and times clean_and_standardize, enrich_leads, each sync_to_*
+method and the whole process_daily_leads run. No API quota is used:
+
+    python benchmarks/bench_pipeline.py --rows 1000 10000 --latency 0.02
+    python benchmarks/bench_pipeline.py --rows 50000 --server-rate-limit 50 --json results.json
+
+Google Ads is reported as skipped: its client speaks gRPC, which has no
+local stand-in here.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lead_processor import LeadProcessor  # noqa: E402
+from mock_servers import MockApollo, MockFacebook, MockHunter, MockMailchimp, MockTwilio  # noqa: E402
+from synthetic_retran import write_retran_file  # noqa: E402
+
+SYNC_METHODS = ['sync_to_mailchimp', 'sync_to_twilio', 'sync_to_google_ads', 'sync_to_facebook_ads']
+
+
+def make_processor(servers: dict, args, workdir: str) -> LeadProcessor:
+    """A LeadProcessor wired to the mocks, with cold in-memory state"""
+    processor = LeadProcessor()
+    processor.config.update(
+        hunter_api_key='benchmark',
+        hunter_api_base=servers['hunter'].url,
+        apollo_api_key='benchmark',
+        apollo_api_base=servers['apollo'].url,
+        mailchimp_api_key='benchmark',
+        mailchimp_api_base=servers['mailchimp'].url,
+        mailchimp_poll_interval=0.1,
+        twilio_account_sid='ACbenchmark',
+        twilio_auth_token='benchmark',
+        twilio_api_base=servers['twilio'].url,
+        google_ads_customer_id='',
+        facebook_access_token='benchmark',
+        facebook_graph_base=f"{servers['facebook'].url}/v18.0",
+        # Client-side limits; 0 = unlimited so the mocks set the pace
+        hunter_rate_limit=args.rate_limit,
+        apollo_rate_limit=args.rate_limit,
+        mailchimp_rate_limit=args.rate_limit,
+        twilio_rate_limit=args.rate_limit,
+        hunter_max_in_flight=args.workers,
+        apollo_max_in_flight=args.workers,
+        mailchimp_max_in_flight=args.workers,
+        twilio_max_in_flight=args.workers,
+        facebook_max_in_flight=args.workers,
+        twilio_workers=args.workers,
+        enrichment_workers=args.workers,
+        # Fresh state per scenario: nothing is skipped as already processed
+        lead_index_path='',
+        enrichment_cache_path='',
+        send_ledger_path='',
+        audience_store_path='',
+        match_key_cache_path='',
+        checkpoint_dir='',
+        metrics_dir='',
+        output_format='csv',
+        parquet_output_dir=os.path.join(workdir, 'parquet'),
+    )
+    return processor
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_scale(rows: int, servers: dict, args, workdir: str) -> dict:
+    """Seconds per stage for one input size"""
+    path = write_retran_file(os.path.join(workdir, f"retran_{rows}.csv"), rows,
+                             duplicate_rate=args.duplicate_rate, missing_rate=args.missing_rate,
+                             unique_owners=True, domain_rate=args.domain_rate)
+    timings = {}
+
+    processor = make_processor(servers, args, workdir)
+    raw, timings['load_retran_data'] = timed(processor.load_retran_data, path)
+    cleaned, timings['clean_and_standardize'] = timed(processor.clean_and_standardize, raw)
+    enriched, timings['enrich_leads'] = timed(processor.enrich_leads, cleaned)
+    hashed, timings['hash_match_keys'] = timed(processor.hash_match_keys, enriched)
+    for method in SYNC_METHODS:
+        if method == 'sync_to_google_ads':
+            timings[method] = None
+            continue
+        _, timings[method] = timed(getattr(processor, method), hashed)
+
+    # End to end on a cold processor, so every stage does its full work again
+    processor = make_processor(servers, args, workdir)
+    _, timings['process_daily_leads'] = timed(processor.process_daily_leads, path,
+                                              output_file=os.path.join(workdir, f"enriched_{rows}.csv"))
+    return {'rows': rows, 'leads': len(cleaned), 'emails': int(enriched['email'].notna().sum()), 'seconds': timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--duplicate-rate', type=float, default=0.05)
+    parser.add_argument('--missing-rate', type=float, default=0.02)
+    parser.add_argument('--domain-rate', type=float, default=0.1, help="Share of addresses Hunter is queried for")
+    parser.add_argument('--latency', type=float, default=0.02, help="Mock fixed latency per request (s)")
+    parser.add_argument('--per-record-latency', type=float, default=0.0001, help="Mock latency per record (s)")
+    parser.add_argument('--server-rate-limit', type=float, default=None, help="Mock requests/sec before 429s")
+    parser.add_argument('--rate-limit', type=float, default=0, help="Client token-bucket rate (0 = unlimited)")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    # Mock rejections (invalid numbers, 429s) are expected; only report the timings
+    logging.getLogger('lead_processor').setLevel(logging.CRITICAL)
+
+    mock_kwargs = {'latency': args.latency, 'per_record_latency': args.per_record_latency,
+                   'rate_limit': args.server_rate_limit}
+    servers = {
+        'hunter': MockHunter(**mock_kwargs),
+        'apollo': MockApollo(**mock_kwargs),
+        'mailchimp': MockMailchimp(batch_delay=0.2, **mock_kwargs),
+        'twilio': MockTwilio(**mock_kwargs),
+        'facebook': MockFacebook(**mock_kwargs),
+    }
+    for server in servers.values():
+        server.start()
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for rows in args.rows:
+                results.append(bench_scale(rows, servers, args, workdir))
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    stages = list(results[0]['seconds']) if results else []
+    print(f"mock latency {args.latency}s + {args.per_record_latency}s/record, {args.workers} workers")
+    print(f"{'stage':>22}" + ''.join(f"{r['rows']:>12,} rows" for r in results) + "   (leads/s)")
+    for stage in stages:
+        cells = []
+        for result in results:
+            seconds = result['seconds'][stage]
+            if seconds is None:
+                cells.append(f"{'skipped':>17}")
+            else:
+                cells.append(f"{seconds:>8.2f}s {result['leads'] / max(seconds, 1e-9):>8,.0f}")
+        print(f"{stage:>22}" + ''.join(cells))
+    rate_limited = sum(server.rate_limited for server in servers.values())
+    if rate_limited:
+        print(f"mocks returned {rate_limited} rate-limited (429) responses")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""Local stand-ins for the provider APIs used by LeadProcessor
+
+Each server answers the same routes as the real provider with canned,
+deterministic data. Latency (fixed plus per-record) and a requests/sec
+limit are configurable, so batching and concurrency can be measured
+offline without spending API quota.
+
+    with MockApollo(latency=0.2) as apollo:
+        processor.config['apollo_api_base'] = apollo.url
+
+Google Ads has no mock: its client talks gRPC, not HTTP/JSON.
+"""
+import hashlib
+import io
+import json
+import tarfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+def _stable_fraction(value: str) -> float:
+    """Deterministic number in [0, 1) for a string"""
+    return int(hashlib.md5(value.lower().encode()).hexdigest()[:8], 16) / 0x100000000
+
+
+class MockProviderServer:
+    """Threaded HTTP server with latency and rate-limit emulation
+
+    Subclasses register routes in ROUTES as {(method, path): handler_name};
+    a handler takes (body, query, suffix) and returns (status, payload,
+    records), where suffix is the part of the path matched by a trailing '*'.
+    """
+
+    ROUTES: Dict[Tuple[str, str], str] = {}
+
+    def __init__(self, latency: float = 0.05, per_record_latency: float = 0.0,
+                 rate_limit: Optional[float] = None, match_rate: float = 0.6, port: int = 0):
+        self.latency = latency
+        self.per_record_latency = per_record_latency
+        self.rate_limit = rate_limit
+        self.match_rate = match_rate
+        self.requests = Counter()
+        self.records = Counter()
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+        self._window = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _dispatch(self, method):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                status, payload = server.handle(method, parsed.path, raw, parse_qs(parsed.query),
+                                                self.headers.get('Content-Type', ''))
+                binary = isinstance(payload, bytes)
+                body = payload if binary else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/gzip' if binary else 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def do_PUT(self):
+                self._dispatch('PUT')
+
+            def do_DELETE(self):
+                self._dispatch('DELETE')
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockProviderServer':
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'MockProviderServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _over_rate_limit(self) -> bool:
+        """Sliding one-second window check"""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            self._window = [t for t in self._window if now - t < 1.0]
+            if len(self._window) >= self.rate_limit:
+                self.rate_limited += 1
+                return True
+            self._window.append(now)
+        return False
+
+    def _route(self, method: str, path: str):
+        name = self.ROUTES.get((method, path))
+        if name is None:
+            for (route_method, route_path), route_name in self.ROUTES.items():
+                # Trailing '*' matches any suffix, e.g. /members/<hash>
+                if route_method == method and route_path.endswith('*') and path.startswith(route_path[:-1]):
+                    return route_name, path[len(route_path) - 1:]
+            return None, None
+        return name, ''
+
+    def handle(self, method: str, path: str, raw: bytes, query: Dict, content_type: str):
+        name, suffix = self._route(method, path)
+        if name is None:
+            return 404, {'error': f'no mock route for {method} {path}'}
+        if self._over_rate_limit():
+            time.sleep(self.latency)
+            return 429, {'error': 'rate limited'}
+
+        if 'json' in content_type and raw:
+            body = json.loads(raw)
+        else:
+            body = {k: v[0] for k, v in parse_qs(raw.decode()).items()} if raw else {}
+
+        status, payload, records = getattr(self, name)(body, query, suffix)
+        with self.lock:
+            self.requests[name] += 1
+            self.records[name] += records
+        time.sleep(self.latency + self.per_record_latency * records)
+        return status, payload
+
+
+class MockHunter(MockProviderServer):
+    """Hunter.io domain search"""
+
+    ROUTES = {
+        ('GET', '/v2/domain-search'): 'domain_search',
+    }
+
+    def domain_search(self, body, query, suffix):
+        domain = query.get('domain', [''])[0]
+        if not domain:
+            return 400, {'errors': [{'id': 'wrong_params', 'details': 'You are missing the domain parameter'}]}, 0
+        emails = [{'value': f"info@{domain}", 'type': 'generic'}] if _stable_fraction(domain) < self.match_rate else []
+        return 200, {'data': {'domain': domain, 'emails': emails}}, 1
+
+
+class MockApollo(MockProviderServer):
+    """Apollo.io people search and bulk_match"""
+
+    ROUTES = {
+        ('POST', '/v1/mixed_people/search'): 'people_search',
+        ('POST', '/api/v1/people/bulk_match'): 'bulk_match',
+    }
+
+    def _person(self, name: str) -> Optional[Dict]:
+        if _stable_fraction(name) >= self.match_rate:
+            return None
+        handle = '.'.join(name.lower().split())
+        return {
+            'email': f"{handle}@example.com",
+            'linkedin_url': f"https://www.linkedin.com/in/{handle.replace('.', '-')}",
+            'title': 'Owner',
+            'organization': {'name': 'Example Co'},
+        }
+
+    def people_search(self, body, query, suffix):
+        person = self._person(body.get('q_keywords', ''))
+        return 200, {'people': [person] if person else []}, 1
+
+    def bulk_match(self, body, query, suffix):
+        details = body.get('details', [])
+        if len(details) > 10:
+            return 422, {'error': 'details accepts at most 10 records'}, 0
+        return 200, {'matches': [self._person(d.get('name', '')) for d in details]}, len(details)
+
+
+class MockMailchimp(MockProviderServer):
+    """Mailchimp list members and /batches
+
+    Batches finish batch_delay seconds after submission. Emails whose local
+    part starts with "invalid" fail with a 400, like Mailchimp's
+    "looks fake or invalid" errors.
+    """
+
+    ROUTES = {
+        ('POST', '/3.0/lists/*'): 'add_member',
+        ('PUT', '/3.0/lists/*'): 'upsert_member',
+        ('POST', '/3.0/batches'): 'submit_batch',
+        ('GET', '/3.0/batches/*'): 'batch_status',
+        ('GET', '/batch-results/*'): 'batch_results',
+    }
+
+    def __init__(self, batch_delay: float = 0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.batch_delay = batch_delay
+        self.members = {}
+        self.batches = {}
+
+    def _apply(self, method: str, path: str, body: Dict) -> Tuple[int, Dict]:
+        email = body.get('email_address', '')
+        if email.startswith('invalid'):
+            return 400, {'title': 'Invalid Resource', 'detail': f"{email} looks fake or invalid"}
+        if path.endswith('/tags'):
+            return 204, {}
+        member_hash = hashlib.md5(email.lower().encode()).hexdigest() if email else path.rsplit('/', 1)[-1]
+        exists = member_hash in self.members
+        if method == 'POST' and exists:
+            return 400, {'title': 'Member Exists', 'detail': f"{email} is already a list member"}
+        with self.lock:
+            self.members[member_hash] = body
+        return 200, {'id': member_hash, 'email_address': email}
+
+    def add_member(self, body, query, suffix):
+        status, payload = self._apply('POST', suffix, body)
+        return status, payload, 1
+
+    def upsert_member(self, body, query, suffix):
+        status, payload = self._apply('PUT', suffix, body)
+        return status, payload, 1
+
+    def submit_batch(self, body, query, suffix):
+        operations = body.get('operations', [])
+        results = []
+        for op in operations:
+            status, payload = self._apply(op['method'], op['path'], json.loads(op.get('body') or '{}'))
+            results.append({'status_code': status, 'operation_id': op.get('operation_id'),
+                            'response': json.dumps(payload)})
+        batch_id = hashlib.md5(f"{time.time()}-{len(self.batches)}".encode()).hexdigest()[:10]
+        with self.lock:
+            self.batches[batch_id] = {'submitted': time.monotonic(), 'results': results}
+        return 200, {'id': batch_id, 'status': 'pending', 'total_operations': len(operations)}, 1
+
+    def batch_status(self, body, query, suffix):
+        batch = self.batches.get(suffix)
+        if batch is None:
+            return 404, {'detail': 'batch not found'}, 0
+        finished = time.monotonic() - batch['submitted'] >= self.batch_delay
+        errored = sum(1 for r in batch['results'] if r['status_code'] >= 400)
+        return 200, {
+            'id': suffix,
+            'status': 'finished' if finished else 'started',
+            'total_operations': len(batch['results']),
+            'finished_operations': len(batch['results']) if finished else 0,
+            'errored_operations': errored if finished else 0,
+            'response_body_url': f"{self.url}/batch-results/{suffix}.tar.gz" if finished else '',
+        }, 0
+
+    def batch_results(self, body, query, suffix):
+        batch = self.batches.get(suffix.replace('.tar.gz', ''))
+        if batch is None:
+            return 404, {'detail': 'batch not found'}, 0
+        content = json.dumps(batch['results']).encode()
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+            info = tarfile.TarInfo(name=f"{suffix}/results.json")
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+        return 200, buffer.getvalue(), 0
+
+
+class MockTwilio(MockProviderServer):
+    """Twilio Messages API
+
+    Numbers in the 555 exchange are rejected with error 21211 (invalid
+    'To' number), like the real API does for unroutable numbers.
+    """
+
+    ROUTES = {
+        ('POST', '/2010-04-01/Accounts/*'): 'create_message',
+    }
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.messages = []
+
+    def create_message(self, body, query, suffix):
+        to = body.get('To', '')
+        if to[2:].startswith('555') or to.startswith('555'):
+            return 400, {'code': 21211, 'message': f"The 'To' number {to} is not a valid phone number.",
+                         'status': 400}, 1
+        with self.lock:
+            self.messages.append(body)
+            sid = f"SM{len(self.messages):032d}"
+        return 201, {'sid': sid, 'to': to, 'status': 'queued'}, 1
+
+
+class MockFacebook(MockProviderServer):
+    """Facebook Graph API custom audiences and /users uploads
+
+    Rejects payloads whose rows do not match the schema length and batches
+    above the 10,000-user limit, and tracks upload sessions.
+    """
+
+    ROUTES = {
+        ('POST', '/v18.0/*'): 'post',
+        ('DELETE', '/v18.0/*'): 'delete',
+    }
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.audiences = {}
+        self.sessions = {}
+
+    def post(self, body, query, suffix):
+        if suffix.endswith('/customaudiences'):
+            audience_id = str(6000000000000 + len(self.audiences))
+            with self.lock:
+                self.audiences[audience_id] = set()
+            return 200, {'id': audience_id}, 1
+        return self._users(suffix, body, add=True)
+
+    def delete(self, body, query, suffix):
+        return self._users(suffix, body, add=False)
+
+    def _users(self, suffix, body, add: bool):
+        audience_id = suffix.split('/')[0]
+        if audience_id not in self.audiences:
+            return 400, {'error': {'message': f"Unknown audience {audience_id}", 'code': 100}}, 0
+        payload = body.get('payload', {})
+        schema, data = payload.get('schema', []), payload.get('data', [])
+        if len(data) > 10000:
+            return 400, {'error': {'message': 'Too many users in one request', 'code': 100}}, 0
+        if any(len(row) != len(schema) for row in data):
+            return 400, {'error': {'message': 'Row length does not match schema', 'code': 100}}, 0
+        session = body.get('session', {})
+        with self.lock:
+            rows = {tuple(row) for row in data}
+            if add:
+                self.audiences[audience_id] |= rows
+            else:
+                self.audiences[audience_id] -= rows
+            if session:
+                self.sessions.setdefault(session['session_id'], []).append(
+                    (session['batch_seq'], session.get('last_batch_flag', False)))
+        return 200, {'audience_id': audience_id, 'session_id': session.get('session_id'),
+                     'num_received': len(data), 'num_invalid_entries': 0}, len(data)
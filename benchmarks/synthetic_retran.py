@@ -0,0 +1,96 @@
+"""Synthetic Retran.com export generator for offline benchmarks"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+STREETS = ['Main', 'Oak', 'Pine', 'Maple', 'Cedar', 'Elm', 'Washington', 'Lake', 'Hill', 'Park']
+SUFFIXES = ['St', 'Ave', 'Blvd', 'Dr', 'Ln', 'Ct', 'Way', 'Rd']
+FIRST_NAMES = ['John', 'Maria', 'David', 'Linda', 'James', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Elizabeth']
+LAST_NAMES = ['Smith', 'Garcia', 'Johnson', 'Martinez', 'Brown', 'Lopez', 'Davis', 'Nguyen', 'Wilson', 'Lee']
+CITIES = {
+    'Los Angeles': '900', 'Riverside': '925', 'San Diego': '921', 'Sacramento': '958',
+    'Fresno': '937', 'Oakland': '946', 'Long Beach': '908', 'Anaheim': '928',
+}
+
+
+def generate_retran_frame(rows: int, duplicate_rate: float = 0.05, missing_rate: float = 0.02,
+                          seed: int = 42, unique_owners: bool = False, domain_rate: float = 0.0) -> pd.DataFrame:
+    """Build a DataFrame shaped like a Retran.com NOD export
+
+    Owner names come from a small pool unless unique_owners is set, which
+    numbers each surname so enrichment lookups do not repeat. domain_rate
+    is the share of addresses carrying a "c/o <company>.com" line, the only
+    leads Hunter.io is queried for.
+    """
+    rng = np.random.default_rng(seed)
+    
+    house_numbers = rng.integers(100, 99999, rows).astype(str)
+    streets = np.array(STREETS)[rng.integers(0, len(STREETS), rows)]
+    suffixes = np.array(SUFFIXES)[rng.integers(0, len(SUFFIXES), rows)]
+    city_names = np.array(list(CITIES))
+    city_idx = rng.integers(0, len(city_names), rows)
+    zip_prefixes = np.array([CITIES[c] for c in city_names])[city_idx]
+    zips = pd.Series(zip_prefixes) + pd.Series(rng.integers(0, 100, rows)).astype(str).str.zfill(2)
+    first = np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), rows)]
+    last = np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), rows)]
+    if unique_owners:
+        last = np.char.add(last, np.arange(rows).astype(str))
+    phones = rng.integers(2000000000, 9999999999, rows).astype(str)
+    
+    addresses = pd.Series(house_numbers) + ' ' + streets + ' ' + suffixes
+    if domain_rate:
+        with_domain = rng.random(rows) < domain_rate
+        addresses[with_domain] += ' c/o ' + pd.Series(np.char.lower(last))[with_domain] + 'holdings.com'
+    
+    df = pd.DataFrame({
+        'Address': addresses,
+        'Name': pd.Series(first) + ' ' + last,
+        'Phone': '(' + pd.Series(phones).str[:3] + ') ' + pd.Series(phones).str[3:6] + '-' + pd.Series(phones).str[6:],
+        'City': city_names[city_idx],
+        'State': 'CA',
+        'Zip': zips,
+        'Sale_Date': pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'Loan_Amount': rng.integers(50000, 1500000, rows),
+    })
+    
+    # Copy earlier rows over later ones to simulate duplicate filings
+    n_dupes = int(rows * duplicate_rate)
+    if n_dupes:
+        targets = rng.choice(rows, n_dupes, replace=False)
+        sources = rng.integers(0, rows, n_dupes)
+        df.iloc[targets] = df.iloc[sources].values
+    
+    # Blank out fields at random to simulate incomplete records
+    for col in ['Address', 'Name', 'Phone']:
+        mask = rng.random(rows) < missing_rate
+        df.loc[mask, col] = None
+    
+    return df
+
+
+def write_retran_file(path: str, rows: int, **kwargs) -> str:
+    """Write a synthetic Retran export to CSV or XLSX based on the extension"""
+    df = generate_retran_frame(rows, **kwargs)
+    if path.endswith('.xlsx'):
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Retran.com export")
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--duplicate-rate', type=float, default=0.05)
+    parser.add_argument('--missing-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--unique-owners', action='store_true')
+    parser.add_argument('--domain-rate', type=float, default=0.0)
+    args = parser.parse_args()
+    
+    write_retran_file(args.path, args.rows, duplicate_rate=args.duplicate_rate,
+                      missing_rate=args.missing_rate, seed=args.seed,
+                      unique_owners=args.unique_owners, domain_rate=args.domain_rate)
+    print(f"Wrote {args.rows} rows to {args.path}")
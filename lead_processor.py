@@ -1,33 +1,610 @@
+import numpy as np
 import pandas as pd
 import requests
 import json
 import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+from difflib import SequenceMatcher
 import os
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Union
+import argparse
+import glob
 import hashlib
 import logging
+import re
+import shutil
+import signal
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from lead_stores import AudienceStore, EnrichmentCache, LeadIndex, MatchKeyCache, SeenKeys, SendLedger
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+class TokenBucket:
+    """Thread-safe token bucket: refills at rate tokens/sec, bursts up to capacity"""
+    
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1.0):
+        """Block until tokens are available, then take them"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class LeadDeduper:
+    """Address/name normalization and blocked fuzzy duplicate detection
+    
+    Addresses are reduced to lowercase tokens with USPS-style suffix,
+    directional and unit abbreviations ("123 Main Street" -> "123 main
+    st", "#2" -> "apt 2"); names drop punctuation and honorifics and have
+    their tokens sorted ("SMITH, JOHN" -> "john smith"). Near matches left
+    after that are only compared within a block of ZIP + house number +
+    first street token + unit number, so the work grows with block sizes
+    rather than with the square of the file, and different units of one
+    building are never merged. Names must match token by token ("Jon" ~
+    "John", but not "Joan"), ignoring middle initials.
+    
+    With persistent set, blocks are kept between calls so one instance
+    dedupes a stream of chunks. At most max_blocks blocks are kept in
+    memory, least recently used first out. Near matches further apart
+    than that are still caught when they are exact after normalization,
+    through the caller's SeenKeys store, which lives on disk.
+    """
+    
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+    
+    ADDRESS_ABBREVIATIONS = {
+        'street': 'st', 'str': 'st', 'avenue': 'ave', 'av': 'ave', 'boulevard': 'blvd', 'drive': 'dr',
+        'lane': 'ln', 'road': 'rd', 'court': 'ct', 'place': 'pl', 'terrace': 'ter', 'circle': 'cir',
+        'highway': 'hwy', 'parkway': 'pkwy', 'square': 'sq', 'trail': 'trl', 'way': 'way',
+        'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+        'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+        'apartment': 'apt', 'suite': 'ste', 'unit': 'unit', 'number': 'apt', 'no': 'apt',
+    }
+    DIRECTIONALS = {'n', 's', 'e', 'w', 'ne', 'nw', 'se', 'sw'}
+    UNIT_DESIGNATORS = {'apt', 'ste', 'unit'}
+    NAME_NOISE = {'mr', 'mrs', 'ms', 'dr', 'jr', 'sr', 'ii', 'iii', 'iv', 'etal', 'et', 'al'}
+    
+    def __init__(self, threshold: float = 0.85, persistent: bool = False, max_blocks: int = 200000):
+        self.threshold = threshold
+        self.persistent = persistent
+        self.max_blocks = max_blocks
+        self.blocks = OrderedDict()
+    
+    def _normalize_address(self, value: str) -> tuple:
+        """(normalized address, "house|street|unit" block part or None)"""
+        tokens = [self.ADDRESS_ABBREVIATIONS.get(token, token)
+                  for token in self.TOKEN_PATTERN.findall(value.lower().replace('#', ' apt '))]
+        street = None
+        if len(tokens) > 1 and tokens[0].isdigit():
+            street_token = next((token for token in tokens[1:] if token not in self.DIRECTIONALS), tokens[1])
+            unit = next((tokens[i + 1] for i in range(1, len(tokens) - 1) if tokens[i] in self.UNIT_DESIGNATORS), '')
+            street = f"{tokens[0]}|{street_token}|{unit}"
+        return ' '.join(tokens), street
+    
+    def _normalize_name(self, value: str) -> str:
+        tokens = self.TOKEN_PATTERN.findall(value.lower())
+        return ' '.join(sorted(token for token in tokens if token not in self.NAME_NOISE))
+    
+    @staticmethod
+    def _map_unique(values: pd.Series, normalize) -> List:
+        """Apply normalize once per distinct value"""
+        codes, uniques = pd.factorize(values.astype(object).where(values.notna(), ''))
+        return [normalize(str(value)) for value in uniques], codes
+    
+    @staticmethod
+    def _arrow_tokens(values: pd.Series, unit_marker: bool = False):
+        """Lowercased [a-z0-9]+ tokens of each value as an Arrow list array; "#" reads as "apt" with unit_marker"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        strings = pc.utf8_lower(pa.array(values.astype(object).where(values.notna(), ''), type=pa.string()))
+        if unit_marker:
+            strings = pc.replace_substring(strings, '#', ' apt ')
+        cleaned = pc.utf8_trim(pc.replace_substring_regex(strings, '[^a-z0-9]+', ' '), ' ')
+        return pc.split_pattern_regex(cleaned, ' ')
+    
+    def _normalize_addresses_arrow(self, addresses: pd.Series) -> tuple:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        tokens = self._arrow_tokens(addresses, unit_marker=True)
+        flat = pc.list_flatten(tokens)
+        index = pc.index_in(flat, value_set=pa.array(list(self.ADDRESS_ABBREVIATIONS)))
+        replacements = pc.take(pa.array(list(self.ADDRESS_ABBREVIATIONS.values())), pc.fill_null(index, 0))
+        mapped = pc.if_else(pc.is_null(index), flat, replacements)
+        normalized = pc.binary_join(pa.ListArray.from_arrays(tokens.offsets, mapped), ' ')
+        
+        directionals = '|'.join(sorted(self.DIRECTIONALS))
+        parts = pc.extract_regex(normalized, rf"^(?P<house>\d+) (?:(?:{directionals}) )*(?P<street>[a-z0-9]+)")
+        designators = '|'.join(sorted(self.UNIT_DESIGNATORS))
+        units = pc.extract_regex(normalized, rf"^\d+ .*?\b(?:{designators}) (?P<unit>[a-z0-9]+)")
+        streets = pc.binary_join_element_wise(pc.struct_field(parts, 'house'), pc.struct_field(parts, 'street'),
+                                              pc.fill_null(pc.struct_field(units, 'unit'), ''), '|')
+        return (normalized.to_numpy(zero_copy_only=False).astype(object),
+                streets.to_numpy(zero_copy_only=False).astype(object))
+    
+    def _normalize_names_arrow(self, names: pd.Series) -> np.ndarray:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        tokens = self._arrow_tokens(names)
+        flat = pc.list_flatten(tokens)
+        parents = pc.list_parent_indices(tokens)
+        keep = pc.and_(pc.invert(pc.is_in(flat, value_set=pa.array(sorted(self.NAME_NOISE)))), pc.not_equal(flat, ''))
+        flat, parents = flat.filter(keep), parents.filter(keep)
+        
+        # Sort tokens within each name: order by (row, token), which keeps rows contiguous
+        order = pc.sort_indices(pa.table({'row': parents, 'token': flat}),
+                                sort_keys=[('row', 'ascending'), ('token', 'ascending')])
+        counts = np.bincount(parents.to_numpy(), minlength=len(names))
+        offsets = pa.array(np.concatenate([[0], np.cumsum(counts)]).astype(np.int32))
+        normalized = pc.binary_join(pa.ListArray.from_arrays(offsets, flat.take(order)), ' ')
+        return normalized.to_numpy(zero_copy_only=False).astype(object)
+    
+    @staticmethod
+    def _use_arrow() -> bool:
+        try:
+            import pyarrow.compute  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    
+    def normalize_addresses(self, addresses: pd.Series) -> tuple:
+        """Normalized addresses and their "house|street|unit" block parts (None without a house number)
+        
+        Vectorized with Arrow compute kernels when pyarrow is installed;
+        otherwise each distinct value goes through _normalize_address.
+        """
+        if self._use_arrow():
+            return self._normalize_addresses_arrow(addresses)
+        normalized, codes = self._map_unique(addresses, self._normalize_address)
+        return (np.array([address for address, _ in normalized], dtype=object)[codes],
+                np.array([street for _, street in normalized], dtype=object)[codes])
+    
+    def normalize_names(self, names: pd.Series) -> np.ndarray:
+        if self._use_arrow():
+            return self._normalize_names_arrow(names)
+        normalized, codes = self._map_unique(names, self._normalize_name)
+        return np.array(normalized, dtype=object)[codes]
+    
+    def _similar(self, a: str, b: str) -> bool:
+        return a == b or SequenceMatcher(None, a, b).ratio() >= self.threshold
+    
+    def _similar_names(self, a: str, b: str) -> bool:
+        """Sorted name tokens pairwise similar; single-letter initials only count when both names have them"""
+        if a == b:
+            return True
+        a_tokens, b_tokens = a.split(), b.split()
+        if len(a_tokens) != len(b_tokens):
+            a_tokens = [token for token in a_tokens if len(token) > 1]
+            b_tokens = [token for token in b_tokens if len(token) > 1]
+        return (len(a_tokens) == len(b_tokens) > 0
+                and all(self._similar(x, y) for x, y in zip(a_tokens, b_tokens)))
+    
+    def near_duplicates(self, addresses: np.ndarray, names: np.ndarray, streets: np.ndarray, zips: np.ndarray,
+                        candidates: np.ndarray) -> np.ndarray:
+        """Mask of candidate rows that fuzzily match an earlier lead in their block
+        
+        Takes the output of normalize_addresses/normalize_names. Only rows
+        where candidates is True are considered, in order, and the first of
+        a group is kept.
+        """
+        block_keys = (pd.Series(zips, dtype=object) + '|' + pd.Series(streets, dtype=object)).where(candidates)
+        blocked = block_keys.notna().to_numpy()
+        
+        # Only blocks with more than one lead (here or from earlier calls) need comparisons
+        shared = blocked & block_keys.duplicated(keep=False).to_numpy()
+        if self.blocks:
+            shared |= blocked & block_keys.isin(self.blocks).to_numpy()
+        
+        duplicates = np.zeros(len(addresses), dtype=bool)
+        keys = block_keys.to_numpy()
+        for i in np.flatnonzero(shared).tolist():
+            kept = self.blocks.setdefault(keys[i], [])
+            self.blocks.move_to_end(keys[i])
+            if any(self._similar_names(names[i], name) and self._similar(addresses[i], address) for address, name in kept):
+                duplicates[i] = True
+            else:
+                kept.append((addresses[i], names[i]))
+        
+        if self.persistent:
+            for i in np.flatnonzero(blocked & ~shared).tolist():
+                self.blocks[keys[i]] = [(addresses[i], names[i])]
+            while len(self.blocks) > self.max_blocks:
+                self.blocks.popitem(last=False)
+        else:
+            self.blocks = OrderedDict()
+        return duplicates
+
+
+MATCH_KEY_COLUMNS = ['email_sha256', 'phone_sha256', 'fn_sha256', 'ln_sha256', 'email_md5']
+
+
+def _hash_match_key_rows(rows: List[tuple]) -> List[tuple]:
+    """Hash normalized (email, phone, first_name, last_name) tuples
+    
+    Module level so it can run in a process pool. Empty fields hash to ''.
+    """
+    sha256 = lambda value: hashlib.sha256(value.encode()).hexdigest() if value else ''
+    return [
+        (sha256(email), sha256(phone), sha256(first_name), sha256(last_name),
+         hashlib.md5(email.encode()).hexdigest() if email else '')
+        for email, phone, first_name, last_name in rows
+    ]
+
+
+class RunCheckpoint:
+    """Completed pipeline stages for one input file
+    
+    Keyed by the SHA-256 of the file contents, so a rerun on the same file
+    resumes after the last completed stage. Stage frames are pickled next
+    to a state.json that records which stages finished and their results.
+    """
+    
+    def __init__(self, root: str, file_path: str):
+        self.key = self.file_hash(file_path)
+        self.directory = os.path.join(root, self.key[:32])
+        self.state_path = os.path.join(self.directory, 'state.json')
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        else:
+            self.state = {'file': file_path, 'created_at': datetime.now().isoformat(), 'stages': {}}
+    
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def prune(root: str, max_age: float):
+        """Remove checkpoints of runs that started more than max_age seconds ago"""
+        if not os.path.isdir(root):
+            return
+        cutoff = time.time() - max_age
+        for name in os.listdir(root):
+            directory = os.path.join(root, name)
+            if os.path.isdir(directory) and os.path.getmtime(directory) < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+    
+    def done(self, stage: str) -> bool:
+        return stage in self.state['stages']
+    
+    def result(self, stage: str):
+        return self.state['stages'].get(stage, {}).get('result')
+    
+    def complete(self, stage: str, result=None):
+        """Record a stage as finished; state.json is replaced atomically"""
+        with self.lock:
+            self.state['stages'][stage] = {'completed_at': datetime.now().isoformat(), 'result': result}
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.state_path)
+    
+    def _frame_path(self, stage: str) -> str:
+        return os.path.join(self.directory, f"{stage}.pkl")
+    
+    def load_frame(self, stage: str) -> Optional[pd.DataFrame]:
+        """The frame saved by a completed stage, or None"""
+        if not self.done(stage) or not os.path.exists(self._frame_path(stage)):
+            return None
+        return pd.read_pickle(self._frame_path(stage))
+    
+    def save_frame(self, stage: str, df: pd.DataFrame):
+        tmp_path = f"{self._frame_path(stage)}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, self._frame_path(stage))
+        self.complete(stage, {'rows': len(df)})
+    
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class PipelineMetrics:
+    """Stage timers and per-API latency histograms for one pipeline run
+    
+    Stages accumulate wall time and rows (so streamed chunks add up); API
+    calls are bucketed by latency and counted by status code. Each stage
+    also records the in-memory size of the frame it produced (the largest
+    one, when streamed) and the process's peak RSS when it finished. The
+    result is exported as a JSON report and a Prometheus textfile.
+    """
+    
+    LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+    
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages = {}
+        self.apis = {}
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def peak_rss() -> Optional[int]:
+        """Peak resident set size of this process in bytes, where the platform reports it"""
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB on Linux
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Time a pipeline stage
+        
+        Set info['rows'] inside the block to get rows/sec, and info['frame']
+        to the stage's output DataFrame to record its memory footprint.
+        """
+        info = {'rows': 0, 'frame': None}
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            elapsed = time.perf_counter() - started
+            frame_bytes = int(info['frame'].memory_usage(deep=True).sum()) if info['frame'] is not None else None
+            peak_rss = self.peak_rss()
+            with self.lock:
+                totals = self.stages.setdefault(name, {'seconds': 0.0, 'rows': 0, 'runs': 0,
+                                                       'frame_bytes': None, 'peak_rss_bytes': None})
+                totals['seconds'] += elapsed
+                totals['rows'] += info['rows'] or 0
+                totals['runs'] += 1
+                if frame_bytes is not None:
+                    totals['frame_bytes'] = max(totals['frame_bytes'] or 0, frame_bytes)
+                totals['peak_rss_bytes'] = peak_rss
+    
+    @contextmanager
+    def call(self, api: str):
+        """Time an outbound call; set info['status'] to the response status code
+        
+        A call that raises is counted under the exception's class name.
+        """
+        info = {'status': 'ok'}
+        started = time.perf_counter()
+        try:
+            yield info
+        except Exception as e:
+            info['status'] = type(e).__name__
+            raise
+        finally:
+            self.observe(api, time.perf_counter() - started, info['status'])
+    
+    def observe(self, api: str, seconds: float, status):
+        with self.lock:
+            totals = self.apis.setdefault(api, {
+                'count': 0, 'sum': 0.0, 'buckets': [0] * len(self.LATENCY_BUCKETS), 'status': {}
+            })
+            totals['count'] += 1
+            totals['sum'] += seconds
+            for i, bound in enumerate(self.LATENCY_BUCKETS):
+                if seconds <= bound:
+                    totals['buckets'][i] += 1
+                    break
+            totals['status'][str(status)] = totals['status'].get(str(status), 0) + 1
+    
+    def report(self) -> Dict:
+        with self.lock:
+            stages = {
+                name: dict(totals, rows_per_sec=round(totals['rows'] / totals['seconds'], 1) if totals['seconds'] else None)
+                for name, totals in self.stages.items()
+            }
+            apis = {}
+            for api, totals in self.apis.items():
+                cumulative = np.cumsum(totals['buckets']).tolist()
+                apis[api] = {
+                    'count': totals['count'],
+                    'mean_seconds': totals['sum'] / totals['count'] if totals['count'] else None,
+                    'sum_seconds': totals['sum'],
+                    'latency_buckets': dict(zip([str(bound) for bound in self.LATENCY_BUCKETS] + ['+Inf'],
+                                                cumulative + [totals['count']])),
+                    'status_codes': dict(totals['status']),
+                }
+        return {
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+            'duration_seconds': time.time() - self.started_at,
+            'stages': stages,
+            'apis': apis,
+        }
+    
+    def memory_summary(self) -> str:
+        """One line per stage: output frame size and peak RSS, in MiB"""
+        mib = lambda value: f"{value / (1 << 20):.1f} MiB" if value is not None else 'n/a'
+        with self.lock:
+            return '\n'.join(
+                f"  {name:<18} frame {mib(totals['frame_bytes']):>12}   peak RSS {mib(totals['peak_rss_bytes']):>12}"
+                for name, totals in self.stages.items()
+            )
+    
+    def write_json(self, path: str, extra: Dict = None):
+        report = self.report()
+        report.update(extra or {})
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    
+    def write_prometheus(self, path: str):
+        """Write a node_exporter textfile; replaced atomically so scrapes never see half a file"""
+        report = self.report()
+        lines = [
+            '# HELP lead_processor_stage_seconds Wall time spent in a pipeline stage during the last run',
+            '# TYPE lead_processor_stage_seconds gauge',
+        ]
+        lines += [f'lead_processor_stage_seconds{{stage="{name}"}} {stage["seconds"]:.6f}'
+                  for name, stage in report['stages'].items()]
+        lines += [
+            '# HELP lead_processor_stage_rows Rows handled by a pipeline stage during the last run',
+            '# TYPE lead_processor_stage_rows gauge',
+        ]
+        lines += [f'lead_processor_stage_rows{{stage="{name}"}} {stage["rows"]}'
+                  for name, stage in report['stages'].items()]
+        lines += [
+            '# HELP lead_processor_stage_rows_per_second Throughput of a pipeline stage during the last run',
+            '# TYPE lead_processor_stage_rows_per_second gauge',
+        ]
+        lines += [f'lead_processor_stage_rows_per_second{{stage="{name}"}} {stage["rows_per_sec"]}'
+                  for name, stage in report['stages'].items() if stage['rows_per_sec'] is not None]
+        lines += [
+            '# HELP lead_processor_stage_frame_bytes In-memory size of the largest frame a pipeline stage produced',
+            '# TYPE lead_processor_stage_frame_bytes gauge',
+        ]
+        lines += [f'lead_processor_stage_frame_bytes{{stage="{name}"}} {stage["frame_bytes"]}'
+                  for name, stage in report['stages'].items() if stage['frame_bytes'] is not None]
+        lines += [
+            '# HELP lead_processor_stage_peak_rss_bytes Peak resident memory of the process when a pipeline stage finished',
+            '# TYPE lead_processor_stage_peak_rss_bytes gauge',
+        ]
+        lines += [f'lead_processor_stage_peak_rss_bytes{{stage="{name}"}} {stage["peak_rss_bytes"]}'
+                  for name, stage in report['stages'].items() if stage['peak_rss_bytes'] is not None]
+        lines += [
+            '# HELP lead_processor_api_request_duration_seconds Latency of outbound API calls',
+            '# TYPE lead_processor_api_request_duration_seconds histogram',
+        ]
+        for api, totals in report['apis'].items():
+            for bound, count in totals['latency_buckets'].items():
+                lines.append(f'lead_processor_api_request_duration_seconds_bucket{{api="{api}",le="{bound}"}} {count}')
+            lines.append(f'lead_processor_api_request_duration_seconds_sum{{api="{api}"}} {totals["sum_seconds"]:.6f}')
+            lines.append(f'lead_processor_api_request_duration_seconds_count{{api="{api}"}} {totals["count"]}')
+        lines += [
+            '# HELP lead_processor_api_requests_total Outbound API calls by status code',
+            '# TYPE lead_processor_api_requests_total counter',
+        ]
+        for api, totals in report['apis'].items():
+            for status, count in totals['status_codes'].items():
+                lines.append(f'lead_processor_api_requests_total{{api="{api}",status="{status}"}} {count}')
+        lines += [
+            '# HELP lead_processor_last_run_timestamp_seconds Start time of the last run',
+            '# TYPE lead_processor_last_run_timestamp_seconds gauge',
+            f'lead_processor_last_run_timestamp_seconds {self.started_at:.0f}',
+        ]
+        
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+
 class LeadProcessor:
+    # Sync stages run by sync_all, keyed by destination
+    SYNC_DESTINATIONS = {
+        'mailchimp': 'sync_to_mailchimp',
+        'twilio': 'sync_to_twilio',
+        'google_ads': 'sync_to_google_ads',
+        'facebook_ads': 'sync_to_facebook_ads',
+    }
+    
+    # Credential that must be set (not a YOUR_ placeholder) for a destination to sync
+    SYNC_CREDENTIALS = {
+        'mailchimp': 'mailchimp_api_key',
+        'twilio': 'twilio_account_sid',
+        'google_ads': 'google_ads_customer_id',
+        'facebook_ads': 'facebook_access_token',
+    }
+    
+    # Fixed Custom Audience schema; missing fields are sent as ''
+    FACEBOOK_SCHEMA = ['EMAIL', 'PHONE', 'FN', 'LN']
+    
+    # Column types for Retran.com exports, by standard column. Everything is
+    # read as text: identifiers keep leading zeros and formatting, and
+    # amounts/dates ("$250,000", "03/15/2025") are parsed by _compact_dtypes
+    RETRAN_SCHEMA = {
+        'property_address': 'str',
+        'owner_name': 'str',
+        'phone': 'str',
+        'city': 'str',
+        'state': 'str',
+        'zip': 'str',
+        'foreclosure_date': 'str',
+        'loan_amount': 'str',
+    }
+    
+    # File extensions process_batch and watch pick up as Retran exports
+    RETRAN_EXTENSIONS = ('.csv', '.xls', '.xlsx')
+    
+    # Expected Retran.com format columns (adjust as needed)
+    COLUMN_MAPPING = {
+        'property_address': ['address', 'property_address', 'street_address', 'full_address'],
+        'owner_name': ['name', 'owner_name', 'property_owner', 'full_name'],
+        'phone': ['phone', 'phone_number', 'contact_phone', 'primary_phone'],
+        'city': ['city', 'property_city'],
+        'state': ['state', 'property_state'],
+        'zip': ['zip', 'zipcode', 'postal_code', 'zip_code'],
+        'foreclosure_date': ['foreclosure_date', 'sale_date', 'auction_date'],
+        'loan_amount': ['loan_amount', 'debt_amount', 'principal_balance']
+    }
+    
+    # Low-cardinality columns stored as categoricals by clean_and_standardize
+    CATEGORY_COLUMNS = ['city', 'state', 'zip']
+    
     def __init__(self):
         # API Configuration
         self.config = {
             # Lead Enrichment APIs
             'hunter_api_key': os.getenv('HUNTER_API_KEY', 'YOUR_HUNTER_API_KEY'),
+            'hunter_api_base': os.getenv('HUNTER_API_BASE', 'https://api.hunter.io'),
             'apollo_api_key': os.getenv('APOLLO_API_KEY', 'YOUR_APOLLO_API_KEY'),
+            'apollo_api_base': os.getenv('APOLLO_API_BASE', 'https://api.apollo.io'),
+            'apollo_bulk_match': os.getenv('APOLLO_BULK_MATCH', 'true').lower() == 'true',
+            'apollo_batch_size': int(os.getenv('APOLLO_BATCH_SIZE', '10')),  # bulk_match accepts up to 10
+            
+            # Enrichment cache (TTLs in seconds)
+            'enrichment_cache_path': os.getenv('ENRICHMENT_CACHE_PATH', 'enrichment_cache.sqlite3'),  # empty = in-memory only
+            'hunter_cache_ttl': int(os.getenv('HUNTER_CACHE_TTL', str(30 * 86400))),
+            'apollo_cache_ttl': int(os.getenv('APOLLO_CACHE_TTL', str(30 * 86400))),
+            'negative_cache_ttl': int(os.getenv('NEGATIVE_CACHE_TTL', str(7 * 86400))),
+            'enrichment_cache_max_entries': int(os.getenv('ENRICHMENT_CACHE_MAX_ENTRIES', '1000000')),
+            
+            # Enrichment concurrency (rate limits in requests/sec, 0 = unlimited)
+            'enrichment_workers': int(os.getenv('ENRICHMENT_WORKERS', '8')),
+            'hunter_rate_limit': float(os.getenv('HUNTER_RATE_LIMIT', '10')),
+            'hunter_max_in_flight': int(os.getenv('HUNTER_MAX_IN_FLIGHT', '5')),
+            'apollo_rate_limit': float(os.getenv('APOLLO_RATE_LIMIT', '2')),
+            'apollo_max_in_flight': int(os.getenv('APOLLO_MAX_IN_FLIGHT', '5')),
             
             # Marketing Platform APIs
             'mailchimp_api_key': os.getenv('MAILCHIMP_API_KEY', 'YOUR_MAILCHIMP_API_KEY'),
             'mailchimp_server': os.getenv('MAILCHIMP_SERVER', 'us1'),  # e.g., us1, us2, etc.
             'mailchimp_list_id': os.getenv('MAILCHIMP_LIST_ID', 'YOUR_LIST_ID'),
+            'mailchimp_api_base': os.getenv('MAILCHIMP_API_BASE', ''),  # empty = https://<server>.api.mailchimp.com
+            'mailchimp_bulk': os.getenv('MAILCHIMP_BULK', 'true').lower() == 'true',
+            'mailchimp_batch_size': int(os.getenv('MAILCHIMP_BATCH_SIZE', '1000')),  # members per /batches request
+            'mailchimp_poll_interval': float(os.getenv('MAILCHIMP_POLL_INTERVAL', '5')),
+            'mailchimp_batch_timeout': float(os.getenv('MAILCHIMP_BATCH_TIMEOUT', '3600')),
+            'mailchimp_rate_limit': float(os.getenv('MAILCHIMP_RATE_LIMIT', '10')),
+            'mailchimp_max_in_flight': int(os.getenv('MAILCHIMP_MAX_IN_FLIGHT', '10')),  # Mailchimp allows 10 connections
             
             'twilio_account_sid': os.getenv('TWILIO_ACCOUNT_SID', 'YOUR_TWILIO_SID'),
             'twilio_auth_token': os.getenv('TWILIO_AUTH_TOKEN', 'YOUR_TWILIO_TOKEN'),
             'twilio_phone_number': os.getenv('TWILIO_PHONE', '+1234567890'),
+            'twilio_api_base': os.getenv('TWILIO_API_BASE', 'https://api.twilio.com'),
+            'twilio_rate_limit': float(os.getenv('TWILIO_RATE_LIMIT', '1')),  # messages/sec for the sender
+            'twilio_max_in_flight': int(os.getenv('TWILIO_MAX_IN_FLIGHT', '4')),
+            'twilio_workers': int(os.getenv('TWILIO_WORKERS', '4')),
+            'twilio_campaign': os.getenv('TWILIO_CAMPAIGN', ''),  # empty = derived from the message text
+            'send_ledger_path': os.getenv('SEND_LEDGER_PATH', 'send_ledger.sqlite3'),
+            'audience_store_path': os.getenv('AUDIENCE_STORE_PATH', 'audience_state.sqlite3'),
             
             # Google Ads
             'google_ads_customer_id': os.getenv('GOOGLE_ADS_CUSTOMER_ID', 'YOUR_CUSTOMER_ID'),
@@ -35,24 +612,158 @@ class LeadProcessor:
             'google_ads_client_id': os.getenv('GOOGLE_ADS_CLIENT_ID', 'YOUR_CLIENT_ID'),
             'google_ads_client_secret': os.getenv('GOOGLE_ADS_CLIENT_SECRET', 'YOUR_CLIENT_SECRET'),
             'google_ads_refresh_token': os.getenv('GOOGLE_ADS_REFRESH_TOKEN', 'YOUR_REFRESH_TOKEN'),
+            'google_ads_incremental': os.getenv('GOOGLE_ADS_INCREMENTAL', 'true').lower() == 'true',
+            'google_ads_user_list': os.getenv('GOOGLE_ADS_USER_LIST', ''),  # empty = created once, then reused
+            'google_ads_chunk_size': int(os.getenv('GOOGLE_ADS_CHUNK_SIZE', '10000')),  # operations per request
+            'google_ads_upload_workers': int(os.getenv('GOOGLE_ADS_UPLOAD_WORKERS', '1')),
             
             # Facebook Ads
             'facebook_access_token': os.getenv('FACEBOOK_ACCESS_TOKEN', 'YOUR_FB_ACCESS_TOKEN'),
             'facebook_ad_account_id': os.getenv('FACEBOOK_AD_ACCOUNT_ID', 'act_YOUR_AD_ACCOUNT_ID'),
             'facebook_app_id': os.getenv('FACEBOOK_APP_ID', 'YOUR_APP_ID'),
             'facebook_app_secret': os.getenv('FACEBOOK_APP_SECRET', 'YOUR_APP_SECRET'),
+            'facebook_graph_base': os.getenv('FACEBOOK_GRAPH_BASE', 'https://graph.facebook.com/v18.0'),
+            'facebook_incremental': os.getenv('FACEBOOK_INCREMENTAL', 'true').lower() == 'true',
+            'facebook_audience_id': os.getenv('FACEBOOK_AUDIENCE_ID', ''),  # empty = created once, then reused
+            'facebook_batch_size': int(os.getenv('FACEBOOK_BATCH_SIZE', '10000')),  # users per request (API max)
+            'facebook_upload_workers': int(os.getenv('FACEBOOK_UPLOAD_WORKERS', '4')),
+            'facebook_max_retries': int(os.getenv('FACEBOOK_MAX_RETRIES', '3')),
+            'facebook_max_in_flight': int(os.getenv('FACEBOOK_MAX_IN_FLIGHT', '4')),
+            
+            # Pipeline
+            'chunk_size': int(os.getenv('LEAD_CHUNK_SIZE', '0')),  # 0 = load the whole file at once
+            'batch_workers': int(os.getenv('BATCH_WORKERS', str(os.cpu_count() or 1))),  # processes loading batch inputs
+            'csv_engine': os.getenv('CSV_ENGINE', 'pyarrow'),  # pyarrow (multithreaded) or pandas
+            'csv_block_size': int(os.getenv('CSV_BLOCK_SIZE', str(16 << 20))),  # bytes per Arrow parse block
+            'output_format': os.getenv('OUTPUT_FORMAT', 'csv'),  # csv, parquet or both
+            'parquet_output_dir': os.getenv('PARQUET_OUTPUT_DIR', 'enriched_leads_parquet'),  # partitioned by run_date
+            'lead_index_path': os.getenv('LEAD_INDEX_PATH', 'lead_index.sqlite3'),  # empty = process every lead
+            'fuzzy_dedupe': os.getenv('FUZZY_DEDUPE', 'true').lower() == 'true',
+            'fuzzy_dedupe_threshold': float(os.getenv('FUZZY_DEDUPE_THRESHOLD', '0.85')),  # name/address similarity
+            'fuzzy_dedupe_max_blocks': int(os.getenv('FUZZY_DEDUPE_MAX_BLOCKS', '200000')),  # blocks kept across chunks
+            'http_timeout': float(os.getenv('HTTP_TIMEOUT', '30')),
+            'http_pool_size': int(os.getenv('HTTP_POOL_SIZE', '32')),
+            'sync_concurrent': os.getenv('SYNC_CONCURRENT', 'true').lower() == 'true',  # fan out to every platform at once
+            'sync_timeout': float(os.getenv('SYNC_TIMEOUT', '3600')),  # per destination; <name>_sync_timeout overrides
+            'checkpoint_dir': os.getenv('CHECKPOINT_DIR', 'checkpoints'),  # empty = no checkpoints
+            'checkpoint_batch_size': int(os.getenv('CHECKPOINT_BATCH_SIZE', '5000')),  # enrichment rows per checkpoint
+            'checkpoint_max_age': float(os.getenv('CHECKPOINT_MAX_AGE', str(7 * 86400))),
+            'metrics_dir': os.getenv('METRICS_DIR', 'metrics'),  # JSON report per run; empty = no export
+            'metrics_textfile': os.getenv('METRICS_TEXTFILE', ''),  # Prometheus textfile; empty = <metrics_dir>/lead_processor.prom
+            'watch_poll_interval': float(os.getenv('WATCH_POLL_INTERVAL', '10')),  # seconds between drop directory scans
+            'watch_settle_seconds': float(os.getenv('WATCH_SETTLE_SECONDS', '5')),  # unchanged this long = fully written
+            'watch_output_dir': os.getenv('WATCH_OUTPUT_DIR', ''),  # empty = <drop dir>/output
+            
+            # Match-key hashing (shared by the Mailchimp, Google Ads and Facebook syncs)
+            'match_key_cache_path': os.getenv('MATCH_KEY_CACHE_PATH', 'match_keys.sqlite3'),  # empty = in-memory only
+            'match_key_workers': int(os.getenv('MATCH_KEY_WORKERS', str(os.cpu_count() or 1))),
+            'match_key_parallel_rows': int(os.getenv('MATCH_KEY_PARALLEL_ROWS', '200000')),  # below this, hash in-process
         }
         
         self.processed_leads = []
         self.enriched_leads = []
         
-    def load_retran_data(self, file_path: str) -> pd.DataFrame:
-        """Load and parse Retran.com CSV/XLS data"""
+        # Audiences created during the current run, reused across chunks
+        self.audience_ids = {}
+        
+        # Per-member errors and synced/failed counts from the last sync, by platform
+        self.sync_errors = {}
+        self.sync_counts = {}
+        
+        # Per-destination results of the last sync_all, and the threads its destinations ran on
+        self.sync_results = {}
+        self._sync_threads = {}
+        
+        # Stage and API call metrics, reset by each process_daily_leads run
+        self.metrics = PipelineMetrics()
+        
+        # Start of the current run, stamped on every lead as processed_date
+        self.run_started = None
+        
+        self._lead_index = None
+        self._enrichment_cache = None
+        self._send_ledger = None
+        self._audience_store = None
+        self._match_key_cache = None
+        self._google_ads = None
+        
+        # Pooled HTTP connections shared by every worker thread
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.config['http_pool_size'],
+            pool_maxsize=self.config['http_pool_size']
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Per-provider token buckets and in-flight caps, created on first use
+        self._rate_limiters = {}
+        self._in_flight = {}
+        self._limits_lock = threading.Lock()
+    
+    @property
+    def lead_index(self) -> Optional[LeadIndex]:
+        """Cross-run index of processed leads, opened on first use"""
+        if self._lead_index is None and self.config['lead_index_path']:
+            self._lead_index = LeadIndex(self.config['lead_index_path'])
+        return self._lead_index
+    
+    @property
+    def send_ledger(self) -> SendLedger:
+        """SMS send ledger, opened on first use"""
+        if self._send_ledger is None:
+            self._send_ledger = SendLedger(self.config['send_ledger_path'] or ':memory:')
+        return self._send_ledger
+    
+    @property
+    def audience_store(self) -> AudienceStore:
+        """Persistent ad audiences and uploaded members, opened on first use"""
+        if self._audience_store is None:
+            self._audience_store = AudienceStore(self.config['audience_store_path'] or ':memory:')
+        return self._audience_store
+    
+    @property
+    def match_key_cache(self) -> MatchKeyCache:
+        """Hashed match-key cache, opened on first use"""
+        if self._match_key_cache is None:
+            self._match_key_cache = MatchKeyCache(self.config['match_key_cache_path'] or ':memory:')
+        return self._match_key_cache
+    
+    @property
+    def enrichment_cache(self) -> EnrichmentCache:
+        """Hunter/Apollo lookup cache, opened on first use"""
+        if self._enrichment_cache is None:
+            self._enrichment_cache = EnrichmentCache(
+                self.config['enrichment_cache_path'] or ':memory:',
+                ttls={
+                    'hunter': self.config['hunter_cache_ttl'],
+                    'apollo': self.config['apollo_cache_ttl'],
+                },
+                negative_ttl=self.config['negative_cache_ttl'],
+                max_entries=self.config['enrichment_cache_max_entries'],
+            )
+        return self._enrichment_cache
+        
+    def load_retran_data(self, file_path: str, chunksize: int = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """Load and parse Retran.com CSV/XLS data
+        
+        Columns known from COLUMN_MAPPING are read with the RETRAN_SCHEMA
+        types instead of inferred ones. CSVs go through the multithreaded
+        Arrow reader unless csv_engine is 'pandas' or pyarrow is missing.
+        With chunksize set, returns an iterator of DataFrames of at most
+        chunksize rows instead of loading the whole file into memory.
+        """
+        if chunksize:
+            return self._iter_retran_chunks(file_path, chunksize)
+        
         try:
             if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
+                if self._use_arrow_csv():
+                    df = self._read_csv_arrow(file_path)
+                else:
+                    df = pd.read_csv(file_path, dtype=self._retran_dtypes(self._csv_header(file_path)))
             elif file_path.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(file_path, dtype=self._retran_dtypes(pd.read_excel(file_path, nrows=0).columns))
             else:
                 raise ValueError("Unsupported file format. Use CSV or XLS/XLSX")
             
@@ -63,65 +774,309 @@ class LeadProcessor:
             logger.error(f"Error loading file {file_path}: {str(e)}")
             raise
     
-    def clean_and_standardize(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Clean and standardize the lead data"""
-        # Expected Retran.com format columns (adjust as needed)
-        column_mapping = {
-            'property_address': ['address', 'property_address', 'street_address', 'full_address'],
-            'owner_name': ['name', 'owner_name', 'property_owner', 'full_name'],
-            'phone': ['phone', 'phone_number', 'contact_phone', 'primary_phone'],
-            'city': ['city', 'property_city'],
-            'state': ['state', 'property_state'],
-            'zip': ['zip', 'zipcode', 'postal_code', 'zip_code'],
-            'foreclosure_date': ['foreclosure_date', 'sale_date', 'auction_date'],
-            'loan_amount': ['loan_amount', 'debt_amount', 'principal_balance']
+    def _retran_dtypes(self, columns) -> Dict[str, str]:
+        """RETRAN_SCHEMA types keyed by the file's own column names"""
+        dtypes = {}
+        for standard_col, possible_cols in self.COLUMN_MAPPING.items():
+            for col in columns:
+                if str(col).lower() in possible_cols:
+                    dtypes[col] = self.RETRAN_SCHEMA[standard_col]
+        return dtypes
+    
+    @staticmethod
+    def _csv_header(file_path: str) -> List[str]:
+        import csv
+        
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            return next(csv.reader(f), [])
+    
+    def _use_arrow_csv(self) -> bool:
+        if self.config['csv_engine'] != 'pyarrow':
+            return False
+        try:
+            import pyarrow.csv  # noqa: F401
+        except ImportError:
+            logger.warning("pyarrow not installed, falling back to the pandas CSV reader")
+            return False
+        return True
+    
+    def _arrow_csv_options(self, file_path: str) -> Dict:
+        """Read/convert options for pyarrow.csv with the Retran column types"""
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        
+        arrow_types = {'str': pa.string()}
+        column_types = {
+            col: arrow_types[dtype] for col, dtype in self._retran_dtypes(self._csv_header(file_path)).items()
         }
+        return {
+            'read_options': pacsv.ReadOptions(use_threads=True, block_size=self.config['csv_block_size']),
+            'convert_options': pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+        }
+    
+    def _read_csv_arrow(self, file_path: str) -> pd.DataFrame:
+        import pyarrow.csv as pacsv
         
-        # Standardize column names
-        standardized_df = pd.DataFrame()
-        for standard_col, possible_cols in column_mapping.items():
-            for col in possible_cols:
-                if col.lower() in [c.lower() for c in df.columns]:
-                    actual_col = next(c for c in df.columns if c.lower() == col.lower())
-                    standardized_df[standard_col] = df[actual_col]
-                    break
+        return pacsv.read_csv(file_path, **self._arrow_csv_options(file_path)).to_pandas()
+    
+    def _iter_csv_arrow(self, file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Stream Arrow record batches, re-sliced into chunks of chunksize rows"""
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        
+        reader = pacsv.open_csv(file_path, **self._arrow_csv_options(file_path))
+        pending = []
+        pending_rows = 0
+        for batch in reader:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            while pending_rows >= chunksize:
+                table = pa.Table.from_batches(pending)
+                yield table.slice(0, chunksize).to_pandas()
+                rest = table.slice(chunksize)
+                pending, pending_rows = rest.to_batches(), rest.num_rows
+        if pending_rows:
+            yield pa.Table.from_batches(pending).to_pandas()
+    
+    def _iter_retran_chunks(self, file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Yield Retran.com data in chunks of at most chunksize rows"""
+        total = 0
+        try:
+            if file_path.endswith('.csv'):
+                if self._use_arrow_csv():
+                    chunks = self._iter_csv_arrow(file_path, chunksize)
+                else:
+                    chunks = pd.read_csv(file_path, chunksize=chunksize,
+                                         dtype=self._retran_dtypes(self._csv_header(file_path)))
+            elif file_path.endswith('.xlsx'):
+                chunks = self._iter_excel_chunks(file_path, chunksize)
+            elif file_path.endswith('.xls'):
+                # Legacy .xls has no streaming reader; slice after a full load
+                logger.warning(f"{file_path} is legacy XLS, loading fully before chunking")
+                df = pd.read_excel(file_path, dtype=self._retran_dtypes(pd.read_excel(file_path, nrows=0).columns))
+                chunks = (df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize))
+            else:
+                raise ValueError("Unsupported file format. Use CSV or XLS/XLSX")
+            
+            for chunk in chunks:
+                total += len(chunk)
+                yield chunk
+            
+            logger.info(f"Streamed {total} records from {file_path}")
+            
+        except Exception as e:
+            logger.error(f"Error loading file {file_path}: {str(e)}")
+            raise
+    
+    def _iter_excel_chunks(self, file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Stream rows from an XLSX workbook without loading it into memory"""
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(c) if c is not None else f'column_{i}' for i, c in enumerate(header)]
+            
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunksize:
+                    yield pd.DataFrame(batch, columns=columns)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=columns)
+        finally:
+            workbook.close()
+    
+    def clean_and_standardize(self, df: pd.DataFrame, seen_keys: Optional[SeenKeys] = None,
+                              deduper: Optional[LeadDeduper] = None) -> pd.DataFrame:
+        """Clean and standardize the lead data
+        
+        With fuzzy_dedupe, duplicates are detected on normalized addresses
+        and names and then by blocked fuzzy matching (see LeadDeduper), not
+        just on the exact text. When streaming, pass the same SeenKeys store
+        and a persistent deduper for every chunk so that duplicates are also
+        dropped across chunk boundaries.
+        """
+        # Standardize column names, resolving each through a lowercase index once
+        lowercase_index = {}
+        for c in df.columns:
+            lowercase_index.setdefault(str(c).lower(), c)
+        
+        columns = {}
+        for standard_col, possible_cols in self.COLUMN_MAPPING.items():
+            actual_col = next((lowercase_index[col] for col in possible_cols if col in lowercase_index), None)
+            if actual_col is not None:
+                columns[standard_col] = df[actual_col]
+        standardized_df = pd.DataFrame(columns)
         
         # Clean the data
         logger.info("Cleaning and standardizing data...")
         
-        # Remove duplicates based on address + name
-        standardized_df['duplicate_key'] = (
-            standardized_df['property_address'].astype(str).str.lower() + 
-            standardized_df['owner_name'].astype(str).str.lower()
-        )
-        standardized_df = standardized_df.drop_duplicates(subset=['duplicate_key'])
-        standardized_df = standardized_df.drop('duplicate_key', axis=1)
+        # Remove records with missing critical data
+        keep = pd.Series(True, index=standardized_df.index)
+        for col in ['property_address', 'owner_name']:
+            if col in standardized_df.columns:
+                keep &= standardized_df[col].notna()
+        
+        # Remove duplicates based on address + name. The key is a stable 64-bit
+        # hash, so it also identifies the lead across chunks and across runs
+        lead_keys = pd.Series(self._lead_keys(standardized_df), index=standardized_df.index)
+        keep = self._drop_duplicates(standardized_df, lead_keys, keep, seen_keys, deduper)
+        
+        standardized_df = standardized_df[keep.values]
+        standardized_df['lead_key'] = lead_keys[keep].values
         
         # Clean phone numbers
         if 'phone' in standardized_df.columns:
-            standardized_df['phone'] = standardized_df['phone'].astype(str).str.replace(r'[^\d]', '', regex=True)
-            standardized_df['phone'] = standardized_df['phone'].apply(
-                lambda x: f"+1{x}" if len(x) == 10 else x if len(x) == 11 else None
-            )
+            standardized_df['phone'] = self._normalize_phones(standardized_df['phone'])
         
-        # Remove records with missing critical data
-        critical_columns = ['property_address', 'owner_name']
-        for col in critical_columns:
-            if col in standardized_df.columns:
-                standardized_df = standardized_df.dropna(subset=[col])
+        standardized_df = self._compact_dtypes(standardized_df)
         
-        # Add processed timestamp
-        standardized_df['processed_date'] = datetime.now().isoformat()
+        # Add processed timestamp: one value for the whole run, so every chunk and file shares it
+        standardized_df['processed_date'] = pd.Timestamp(self.run_started or datetime.now())
         
         logger.info(f"Cleaned data: {len(standardized_df)} records remaining")
         return standardized_df
     
+    def _compact_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Store the standardized columns in compact types
+        
+        city, state and zip repeat heavily and become categoricals;
+        loan_amount is parsed from text such as "$250,000" into float64
+        (always, so every chunk and every day's Parquet part share one
+        schema) and foreclosure_date into a datetime. Values that do not
+        parse become NaN/NaT. Safe to call again on an already compact frame.
+        """
+        for col in self.CATEGORY_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        
+        if 'loan_amount' in df.columns:
+            amounts = df['loan_amount']
+            if not pd.api.types.is_numeric_dtype(amounts):
+                amounts = amounts.astype(object).where(amounts.notna()).astype(str).str.replace(r'[$,\s]', '', regex=True)
+            df['loan_amount'] = pd.to_numeric(amounts, errors='coerce').astype('float64')
+        
+        if 'foreclosure_date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['foreclosure_date']):
+            dates = df['foreclosure_date']
+            parsed = pd.to_datetime(dates, format='ISO8601', errors='coerce')
+            retry = parsed.isna() & dates.notna()
+            if retry.any():
+                # Non-ISO dates (e.g. 03/15/2025) take the slower per-value parser
+                parsed[retry] = pd.to_datetime(dates[retry], format='mixed', errors='coerce')
+            unparsed = int((parsed.isna() & dates.notna()).sum())
+            if unparsed:
+                logger.warning(f"{unparsed} foreclosure dates could not be parsed")
+            df['foreclosure_date'] = parsed
+        return df
+    
+    def _drop_duplicates(self, df: pd.DataFrame, lead_keys: pd.Series, keep: pd.Series,
+                         seen_keys: Optional[SeenKeys] = None, deduper: Optional[LeadDeduper] = None) -> pd.Series:
+        """keep with duplicate leads (and leads in seen_keys) switched off; adds the kept keys to seen_keys"""
+        dedupe_keys = lead_keys
+        if self.config['fuzzy_dedupe']:
+            # Compare normalized forms instead; lead_key stays on the raw text so
+            # the lead index keeps recognising leads from earlier runs
+            deduper = deduper or LeadDeduper(self.config['fuzzy_dedupe_threshold'])
+            addresses, streets = deduper.normalize_addresses(df['property_address'])
+            names = deduper.normalize_names(df['owner_name'])
+            dedupe_keys = pd.Series(
+                pd.util.hash_array(addresses + '\x1f' + names, categorize=False).view('int64'),
+                index=df.index
+            )
+        keep = keep & ~dedupe_keys.duplicated()
+        
+        # Drop keys already seen in earlier chunks
+        if seen_keys is not None:
+            keep &= ~seen_keys.contains(dedupe_keys.to_numpy())
+        
+        if self.config['fuzzy_dedupe']:
+            zips = (df['zip'].astype(object).where(df['zip'].notna(), '').astype(str).to_numpy()
+                    if 'zip' in df.columns else np.full(len(df), '', dtype=object))
+            near_duplicates = deduper.near_duplicates(addresses, names, streets, zips, keep.to_numpy())
+            if near_duplicates.any():
+                logger.info(f"Dropped {int(near_duplicates.sum())} near-duplicate leads")
+                keep &= ~near_duplicates
+        
+        if seen_keys is not None:
+            seen_keys.add(dedupe_keys[keep].to_numpy())
+        return keep
+    
+    @staticmethod
+    def _lead_keys(df: pd.DataFrame) -> np.ndarray:
+        """Stable int64 hash of the lowercase property_address + owner_name"""
+        key = (
+            df['property_address'].astype(str).str.lower() + '\x1f' +
+            df['owner_name'].astype(str).str.lower()
+        )
+        return pd.util.hash_array(key.to_numpy(dtype=object), categorize=False).view('int64')
+    
+    @staticmethod
+    def _normalize_phones(phones: pd.Series) -> pd.Series:
+        """Strip non-digits and format as +1XXXXXXXXXX (11-digit numbers kept as is)
+        
+        Object columns are processed as fixed-width code points of the whole
+        column at once instead of running a Python regex per value.
+        """
+        arrow_backed = getattr(phones.dtype, 'storage', None) == 'pyarrow'
+        chars = None if arrow_backed else np.asarray(phones.fillna('').astype(str).to_numpy(dtype=object), dtype=str)
+        width = 0 if arrow_backed else chars.dtype.itemsize // 4
+        if arrow_backed or len(chars) == 0 or width == 0 or width > 32:
+            # Arrow strings already run the regex in native code; empty or
+            # unusually long values are also cheaper through the regex
+            digits = phones.astype(str).str.replace(r'\D+', '', regex=True)
+            lengths = digits.str.len()
+            return ('+1' + digits).where(lengths == 10, digits.where(lengths == 11))
+        
+        # Move digit code points to the front of each row; zero padding ends the string
+        codes = chars.view(np.uint32).reshape(len(chars), width)
+        is_digit = (codes >= ord('0')) & (codes <= ord('9'))
+        order = np.argsort(~is_digit, axis=1, kind='stable')
+        packed = np.take_along_axis(np.where(is_digit, codes, 0), order, axis=1)
+        digits = np.ascontiguousarray(packed).view(f'<U{width}').ravel()
+        lengths = is_digit.sum(axis=1)
+        
+        result = np.full(len(chars), None, dtype=object)
+        result[lengths == 11] = digits[lengths == 11]
+        result[lengths == 10] = np.char.add('+1', digits[lengths == 10])
+        return pd.Series(result, index=phones.index)
+    
+    def _provider_limits(self, provider: str):
+        """Token bucket (or None) and in-flight semaphore for a provider"""
+        with self._limits_lock:
+            if provider not in self._in_flight:
+                rate = self.config.get(f'{provider}_rate_limit', 0)
+                self._rate_limiters[provider] = TokenBucket(rate) if rate > 0 else None
+                max_in_flight = self.config.get(f'{provider}_max_in_flight') or self.config['http_pool_size']
+                self._in_flight[provider] = threading.BoundedSemaphore(max_in_flight)
+            return self._rate_limiters[provider], self._in_flight[provider]
+    
+    def _http(self, provider: str, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the shared session, honouring the provider's limits"""
+        limiter, in_flight = self._provider_limits(provider)
+        if limiter:
+            limiter.acquire()
+        kwargs.setdefault('timeout', self.config['http_timeout'])
+        with in_flight, self.metrics.call(provider) as call:
+            response = self.session.request(method, url, **kwargs)
+            call['status'] = response.status_code
+            return response
+    
     def enrich_with_hunter(self, email_domain: str) -> Optional[str]:
         """Enrich lead with email using Hunter.io API"""
         if not self.config['hunter_api_key'] or self.config['hunter_api_key'] == 'YOUR_HUNTER_API_KEY':
             return None
+        
+        cache_key = email_domain.lower()
+        cached = self.enrichment_cache.get('hunter', cache_key)
+        if cached is not EnrichmentCache.MISS:
+            return cached
             
-        url = f"https://api.hunter.io/v2/domain-search"
+        url = f"{self.config['hunter_api_base']}/v2/domain-search"
         params = {
             'domain': email_domain,
             'api_key': self.config['hunter_api_key'],
@@ -129,11 +1084,14 @@ class LeadProcessor:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self._http('hunter', 'GET', url, params=params)
             if response.status_code == 200:
                 data = response.json()
+                email = None
                 if data.get('data', {}).get('emails'):
-                    return data['data']['emails'][0]['value']
+                    email = data['data']['emails'][0]['value']
+                self.enrichment_cache.set('hunter', cache_key, email)
+                return email
         except Exception as e:
             logger.error(f"Hunter.io API error: {str(e)}")
         
@@ -143,8 +1101,13 @@ class LeadProcessor:
         """Enrich lead with Apollo.io API"""
         if not self.config['apollo_api_key'] or self.config['apollo_api_key'] == 'YOUR_APOLLO_API_KEY':
             return {}
+        
+        cache_key = f"{str(name).lower()}|{(company or '').lower()}"
+        cached = self.enrichment_cache.get('apollo', cache_key)
+        if cached is not EnrichmentCache.MISS:
+            return cached
             
-        url = "https://api.apollo.io/v1/mixed_people/search"
+        url = f"{self.config['apollo_api_base']}/v1/mixed_people/search"
         headers = {
             'Cache-Control': 'no-cache',
             'Content-Type': 'application/json',
@@ -161,355 +1124,1443 @@ class LeadProcessor:
             data['q_organization_domains'] = company
         
         try:
-            response = requests.post(url, headers=headers, json=data)
+            response = self._http('apollo', 'POST', url, headers=headers, json=data)
             if response.status_code == 200:
                 result = response.json()
+                person_data = {}
                 if result.get('people'):
-                    person = result['people'][0]
-                    return {
-                        'email': person.get('email'),
-                        'linkedin_url': person.get('linkedin_url'),
-                        'title': person.get('title'),
-                        'organization': person.get('organization', {}).get('name')
-                    }
+                    person_data = self._apollo_person(result['people'][0])
+                self.enrichment_cache.set('apollo', cache_key, person_data)
+                return person_data
         except Exception as e:
             logger.error(f"Apollo.io API error: {str(e)}")
         
         return {}
     
-    def enrich_leads(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Enrich leads with email and additional data"""
+    @staticmethod
+    def _apollo_person(person: Dict) -> Dict:
+        """Fields we keep from an Apollo.io person record"""
+        return {
+            'email': person.get('email'),
+            'linkedin_url': person.get('linkedin_url'),
+            'title': person.get('title'),
+            'organization': (person.get('organization') or {}).get('name')
+        }
+    
+    def enrich_with_apollo_bulk(self, names: List[str]) -> List[Dict]:
+        """Enrich up to apollo_batch_size owners with one Apollo.io bulk_match call
+        
+        Returns one dict per name, in order ({} when there is no match).
+        """
+        if not self.config['apollo_api_key'] or self.config['apollo_api_key'] == 'YOUR_APOLLO_API_KEY':
+            return [{} for _ in names]
+        
+        results = []
+        pending = []
+        for i, name in enumerate(names):
+            cached = self.enrichment_cache.get('apollo', f"{str(name).lower()}|")
+            results.append(None if cached is EnrichmentCache.MISS else cached)
+            if cached is EnrichmentCache.MISS:
+                pending.append(i)
+        
+        if pending:
+            url = f"{self.config['apollo_api_base']}/api/v1/people/bulk_match"
+            headers = {
+                'Cache-Control': 'no-cache',
+                'Content-Type': 'application/json',
+                'X-Api-Key': self.config['apollo_api_key']
+            }
+            data = {
+                'details': [{'name': names[i]} for i in pending],
+                'reveal_personal_emails': False
+            }
+            
+            try:
+                response = self._http('apollo', 'POST', url, headers=headers, json=data)
+                if response.status_code == 200:
+                    # Matches come back in the same order as the details sent
+                    matches = response.json().get('matches') or []
+                    for i, person in zip(pending, matches):
+                        results[i] = self._apollo_person(person) if person else {}
+                        self.enrichment_cache.set('apollo', f"{str(names[i]).lower()}|", results[i])
+                else:
+                    logger.error(f"Apollo.io bulk match failed: {response.status_code}")
+            except Exception as e:
+                logger.error(f"Apollo.io API error: {str(e)}")
+        
+        return [result or {} for result in results]
+    
+    def _enrich_with_hunter_domains(self, address) -> Dict:
+        """Try Hunter.io on any domain-like parts of the address"""
+        if address is not None:
+            potential_domains = [part for part in str(address).split() if '.' in part]
+            for domain in potential_domains:
+                email = self.enrich_with_hunter(domain)
+                if email:
+                    return {'email': email}
+        return {}
+    
+    @staticmethod
+    def _apollo_fields(apollo_data: Dict) -> Dict:
+        """Enrichment columns for an Apollo.io result, or {} without an email"""
+        if not apollo_data.get('email'):
+            return {}
+        return {
+            'email': apollo_data['email'],
+            'linkedin_url': apollo_data.get('linkedin_url'),
+            'job_title': apollo_data.get('title'),
+        }
+    
+    def _enrich_row(self, name: str, address) -> Dict:
+        """Look up one lead: Hunter.io on domains in the address, then Apollo.io"""
+        return self._enrich_with_hunter_domains(address) or self._apollo_fields(self.enrich_with_apollo(name))
+    
+    def _enrich_apollo_batched(self, pool: ThreadPoolExecutor, names) -> List[Dict]:
+        """Look up names through bulk_match, sending batches in parallel on pool"""
+        unique_names = list(dict.fromkeys(names))
+        batch_size = max(1, self.config['apollo_batch_size'])
+        batches = [unique_names[i:i + batch_size] for i in range(0, len(unique_names), batch_size)]
+        
+        by_name = {}
+        for batch, batch_results in zip(batches, pool.map(self.enrich_with_apollo_bulk, batches)):
+            by_name.update(zip(batch, batch_results))
+        return [self._apollo_fields(by_name[name]) for name in names]
+    
+    def enrich_leads(self, df: pd.DataFrame, workers: int = None) -> pd.DataFrame:
+        """Enrich leads with email and additional data
+        
+        Leads are looked up concurrently on a thread pool of workers threads.
+        Each provider is held to its own token-bucket rate and in-flight cap,
+        so Hunter and Apollo calls for different leads overlap. With
+        apollo_bulk_match, leads Hunter could not resolve are sent to Apollo
+        in multi-record bulk_match batches instead of one search per owner.
+        """
         logger.info("Starting lead enrichment...")
         enriched_df = df.copy()
+        enrich_columns = ['email', 'linkedin_url', 'job_title']
         
-        # Add email column if not exists
-        if 'email' not in enriched_df.columns:
-            enriched_df['email'] = None
+        # Add enrichment columns if not exists (keeps a fixed schema across chunks)
+        for col in enrich_columns:
+            if col not in enriched_df.columns:
+                enriched_df[col] = None
         
-        for index, row in enriched_df.iterrows():
-            # Skip if email already exists
-            if pd.notna(row.get('email')):
-                continue
-                
-            name = row.get('owner_name', '')
-            
-            # Try to extract domain from address for Hunter.io
-            if 'property_address' in row:
-                address_parts = str(row['property_address']).split()
-                potential_domains = [part for part in address_parts if '.' in part]
-                
-                for domain in potential_domains:
-                    email = self.enrich_with_hunter(domain)
-                    if email:
-                        enriched_df.at[index, 'email'] = email
-                        break
-            
-            # Try Apollo.io for professional email
-            if pd.isna(enriched_df.at[index, 'email']):
-                apollo_data = self.enrich_with_apollo(name)
-                if apollo_data.get('email'):
-                    enriched_df.at[index, 'email'] = apollo_data['email']
-                    enriched_df.at[index, 'linkedin_url'] = apollo_data.get('linkedin_url')
-                    enriched_df.at[index, 'job_title'] = apollo_data.get('title')
-            
-            # Rate limiting
-            time.sleep(0.5)
+        # Skip if email already exists
+        positions = np.flatnonzero(enriched_df['email'].isna().to_numpy())
+        names = (enriched_df['owner_name'] if 'owner_name' in enriched_df.columns
+                 else pd.Series('', index=enriched_df.index)).to_numpy(dtype=object)[positions]
+        addresses = (enriched_df['property_address'].to_numpy(dtype=object)[positions]
+                     if 'property_address' in enriched_df.columns else [None] * len(positions))
+        
+        workers = workers or self.config['enrichment_workers']
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            if self.config['apollo_bulk_match']:
+                results = list(pool.map(self._enrich_with_hunter_domains, addresses))
+                missing = [i for i, result in enumerate(results) if not result]
+                for i, result in zip(missing, self._enrich_apollo_batched(pool, [names[i] for i in missing])):
+                    results[i] = result
+            else:
+                results = list(pool.map(self._enrich_row, names, addresses))
+        
+        # Write results back in one assignment instead of per-cell writes
+        found = [i for i, result in enumerate(results) if result]
+        if found:
+            values = pd.DataFrame([results[i] for i in found], columns=enrich_columns)
+            enriched_df.iloc[positions[found], [enriched_df.columns.get_loc(c) for c in enrich_columns]] = values.to_numpy()
         
         logger.info(f"Enrichment complete. Found emails for {enriched_df['email'].notna().sum()} leads")
+        if self._enrichment_cache is not None:
+            for provider, counters in self._enrichment_cache.stats.items():
+                logger.info(f"Enrichment cache [{provider}]: {counters['hits']} hits, "
+                            f"{counters['negative_hits']} negative hits, {counters['misses']} misses")
         return enriched_df
     
-    def sync_to_mailchimp(self, df: pd.DataFrame) -> bool:
-        """Sync leads to Mailchimp email list"""
+    def hash_match_keys(self, df: pd.DataFrame, workers: int = None) -> pd.DataFrame:
+        """Normalize and hash email, phone and first/last name once per lead
+        
+        Adds MATCH_KEY_COLUMNS (SHA-256 for the ad platforms, the MD5
+        subscriber hash for Mailchimp) for the sync methods to reuse. Leads
+        whose inputs are in the match-key cache are not hashed again; the
+        rest are hashed across a process pool once there are at least
+        match_key_parallel_rows of them.
+        """
+        hashed_df = df.copy()
+        if df.empty:
+            for col in MATCH_KEY_COLUMNS:
+                hashed_df[col] = pd.Series(dtype=object)
+            return hashed_df
+        
+        def column(name: str) -> pd.Series:
+            if name not in df.columns:
+                return pd.Series('', index=df.index, dtype=object)
+            return df[name].astype(object).where(df[name].notna(), '').astype(str)
+        
+        name_parts = column('owner_name').str.lower().str.split()
+        normalized = pd.DataFrame({
+            'email': column('email').str.strip().str.lower(),
+            'phone': column('phone'),
+            'first_name': name_parts.str[0].fillna(''),
+            'last_name': name_parts.str[1:].str.join(' ').fillna(''),
+        })
+        content_keys = pd.util.hash_pandas_object(normalized, index=False, categorize=False).to_numpy().view('int64')
+        
+        cached = self.match_key_cache.lookup(content_keys)
+        missing = np.fromiter((key not in cached for key in content_keys.tolist()), dtype=bool, count=len(content_keys))
+        pending_keys, first = np.unique(content_keys[missing], return_index=True)
+        pending_rows = list(normalized[missing].iloc[first].itertuples(index=False, name=None))
+        
+        workers = workers or self.config['match_key_workers']
+        if workers > 1 and len(pending_rows) >= self.config['match_key_parallel_rows']:
+            size = -(-len(pending_rows) // workers)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                hashes = [row for part in pool.map(
+                    _hash_match_key_rows, [pending_rows[i:i + size] for i in range(0, len(pending_rows), size)]
+                ) for row in part]
+        else:
+            hashes = _hash_match_key_rows(pending_rows)
+        
+        if hashes:
+            self.match_key_cache.store(pending_keys.tolist(), hashes)
+            cached.update(zip(pending_keys.tolist(), hashes))
+        
+        values = pd.DataFrame([cached[key] for key in content_keys.tolist()], columns=MATCH_KEY_COLUMNS, index=df.index)
+        for col in MATCH_KEY_COLUMNS:
+            hashed_df[col] = values[col]
+        
+        logger.info(f"Hashed match keys for {len(pending_rows)} leads, {len(df) - int(missing.sum())} from cache")
+        return hashed_df
+    
+    def _with_match_keys(self, df: pd.DataFrame) -> pd.DataFrame:
+        """df with MATCH_KEY_COLUMNS, hashing only if the stage has not run yet"""
+        if all(col in df.columns for col in MATCH_KEY_COLUMNS):
+            return df
+        return self.hash_match_keys(df)
+    
+    def _mailchimp_members(self, df: pd.DataFrame) -> List[tuple]:
+        """(email, subscriber_hash, member_data) for every lead with an email"""
+        leads = df[df['email'].notna()] if 'email' in df.columns else df.iloc[0:0]
+        if leads.empty:
+            return []
+        leads = self._with_match_keys(leads)
+        
+        def column(name: str) -> pd.Series:
+            if name not in leads.columns:
+                return pd.Series('', index=leads.index, dtype=object)
+            return leads[name].astype(object).where(leads[name].notna(), '').astype(str)
+        
+        name_parts = column('owner_name').str.split()
+        merge_fields = pd.DataFrame({
+            'FNAME': name_parts.str[0].fillna(''),
+            'LNAME': name_parts.str[1:].str.join(' ').fillna(''),
+            'PHONE': column('phone'),
+            'ADDRESS': column('property_address'),
+            'CITY': column('city'),
+            'STATE': column('state'),
+            'ZIP': column('zip'),
+        }).to_dict('records')
+        
+        emails = leads['email'].astype(str).tolist()
+        return [
+            (email, member_hash, {
+                'email_address': email,
+                'status': 'subscribed',
+                'merge_fields': fields,
+                'tags': ['foreclosure-lead', 'retran-import']
+            })
+            for email, member_hash, fields in zip(emails, leads['email_md5'].tolist(), merge_fields)
+        ]
+    
+    def _mailchimp_base(self) -> str:
+        return self.config['mailchimp_api_base'] or f"https://{self.config['mailchimp_server']}.api.mailchimp.com"
+    
+    def sync_to_mailchimp(self, df: pd.DataFrame, bulk: bool = None) -> bool:
+        """Sync leads to Mailchimp email list
+        
+        With bulk (the mailchimp_bulk default), members are upserted through
+        the /batches endpoint in chunks instead of one request per member.
+        Returns True when no lead has an email, as there is nothing to sync.
+        """
         if not self.config['mailchimp_api_key'] or self.config['mailchimp_api_key'] == 'YOUR_MAILCHIMP_API_KEY':
             logger.warning("Mailchimp API key not configured")
             return False
+        
+        members = self._mailchimp_members(df)
+        self.sync_errors['mailchimp'] = []
+        if not members:
+            logger.info("No leads with an email to sync to Mailchimp")
+            self.sync_counts['mailchimp'] = {'synced': 0, 'failed': 0}
+            return True
+        if bulk if bulk is not None else self.config['mailchimp_bulk']:
+            return self._sync_mailchimp_batches(members)
             
-        url = f"https://{self.config['mailchimp_server']}.api.mailchimp.com/3.0/lists/{self.config['mailchimp_list_id']}/members"
+        url = f"{self._mailchimp_base()}/3.0/lists/{self.config['mailchimp_list_id']}/members"
         headers = {
             'Authorization': f"Bearer {self.config['mailchimp_api_key']}",
             'Content-Type': 'application/json'
         }
         
         success_count = 0
-        for _, row in df.iterrows():
-            if pd.isna(row.get('email')):
-                continue
-                
-            member_data = {
-                'email_address': row['email'],
-                'status': 'subscribed',
-                'merge_fields': {
-                    'FNAME': row.get('owner_name', '').split()[0] if row.get('owner_name') else '',
-                    'LNAME': ' '.join(row.get('owner_name', '').split()[1:]) if row.get('owner_name') else '',
-                    'PHONE': row.get('phone', ''),
-                    'ADDRESS': row.get('property_address', ''),
-                    'CITY': row.get('city', ''),
-                    'STATE': row.get('state', ''),
-                    'ZIP': row.get('zip', '')
-                },
-                'tags': ['foreclosure-lead', 'retran-import']
-            }
-            
+        for email, member_hash, member_data in members:
             try:
-                response = requests.post(url, headers=headers, json=member_data)
+                response = self._http('mailchimp', 'POST', url, headers=headers, json=member_data)
                 if response.status_code in [200, 201]:
                     success_count += 1
                 elif response.status_code == 400:
                     # Member already exists, update instead
-                    member_hash = hashlib.md5(row['email'].lower().encode()).hexdigest()
                     update_url = f"{url}/{member_hash}"
-                    requests.put(update_url, headers=headers, json=member_data)
-                    success_count += 1
-                    
-                time.sleep(0.1)  # Rate limiting
+                    update_response = self._http('mailchimp', 'PUT', update_url, headers=headers, json=member_data)
+                    if update_response.status_code == 200:
+                        success_count += 1
+                    else:
+                        self.sync_errors['mailchimp'].append({
+                            'email': email,
+                            'status_code': update_response.status_code,
+                            'error': update_response.text,
+                        })
+                else:
+                    self.sync_errors['mailchimp'].append({
+                        'email': email,
+                        'status_code': response.status_code,
+                        'error': response.text,
+                    })
                 
             except Exception as e:
-                logger.error(f"Mailchimp sync error for {row.get('email')}: {str(e)}")
+                logger.error(f"Mailchimp sync error for {email}: {str(e)}")
+                self.sync_errors['mailchimp'].append({'email': email, 'error': str(e)})
         
         logger.info(f"Synced {success_count} leads to Mailchimp")
+        self.sync_counts['mailchimp'] = {'synced': success_count, 'failed': len(members) - success_count}
         return success_count > 0
     
-    def sync_to_twilio(self, df: pd.DataFrame, message: str = None) -> bool:
-        """Send SMS to leads via Twilio"""
+    def _sync_mailchimp_batches(self, members: List[tuple]) -> bool:
+        """Upsert members through chunked /batches requests and wait for them to finish"""
+        base = f"{self._mailchimp_base()}/3.0"
+        list_id = self.config['mailchimp_list_id']
+        headers = {
+            'Authorization': f"Bearer {self.config['mailchimp_api_key']}",
+            'Content-Type': 'application/json'
+        }
+        emails_by_hash = {member_hash: email for email, member_hash, _ in members}
+        batch_size = max(1, self.config['mailchimp_batch_size'])
+        
+        # Submit every chunk first so Mailchimp processes them in parallel
+        batch_sizes = {}
+        for start in range(0, len(members), batch_size):
+            operations = []
+            for email, member_hash, member_data in members[start:start + batch_size]:
+                # PUT on the subscriber hash creates or updates in one operation
+                body = dict(member_data, status_if_new=member_data['status'])
+                tags = body.pop('tags')
+                operations.append({
+                    'method': 'PUT',
+                    'path': f"/lists/{list_id}/members/{member_hash}",
+                    'operation_id': member_hash,
+                    'body': json.dumps(body)
+                })
+                operations.append({
+                    'method': 'POST',
+                    'path': f"/lists/{list_id}/members/{member_hash}/tags",
+                    'operation_id': f"{member_hash}:tags",
+                    'body': json.dumps({'tags': [{'name': tag, 'status': 'active'} for tag in tags]})
+                })
+            
+            try:
+                response = self._http('mailchimp', 'POST', f"{base}/batches", headers=headers,
+                                      json={'operations': operations})
+                if response.status_code == 200:
+                    batch_sizes[response.json()['id']] = len(operations) // 2
+                else:
+                    logger.error(f"Mailchimp batch submit failed: {response.status_code} {response.text}")
+                    self.sync_errors['mailchimp'].extend(
+                        {'email': email, 'error': f"batch submit failed: {response.status_code}"}
+                        for email, _, _ in members[start:start + batch_size]
+                    )
+            except Exception as e:
+                logger.error(f"Mailchimp batch submit error: {str(e)}")
+                self.sync_errors['mailchimp'].extend(
+                    {'email': email, 'error': str(e)} for email, _, _ in members[start:start + batch_size]
+                )
+        
+        # Poll until every batch has finished, then collect per-member errors
+        deadline = time.monotonic() + self.config['mailchimp_batch_timeout']
+        pending = list(batch_sizes)
+        unreadable = []
+        while pending and time.monotonic() < deadline:
+            still_pending = []
+            for batch_id in pending:
+                try:
+                    status = self._http('mailchimp', 'GET', f"{base}/batches/{batch_id}", headers=headers).json()
+                except Exception as e:
+                    logger.error(f"Mailchimp batch status error for {batch_id}: {str(e)}")
+                    still_pending.append(batch_id)
+                    continue
+                
+                if status.get('status') != 'finished':
+                    still_pending.append(batch_id)
+                elif status.get('errored_operations') and status.get('response_body_url'):
+                    try:
+                        self.sync_errors['mailchimp'].extend(
+                            self._collect_mailchimp_errors(status['response_body_url'], emails_by_hash)
+                        )
+                    except Exception as e:
+                        # The batch ran, but which members failed is unknown
+                        logger.error(f"Mailchimp batch results error for {batch_id}: {str(e)}")
+                        unreadable.append(batch_id)
+            pending = still_pending
+            if pending:
+                time.sleep(self.config['mailchimp_poll_interval'])
+        
+        for batch_id in pending:
+            logger.error(f"Mailchimp batch {batch_id} did not finish in time")
+        
+        failed_emails = {error['email'] for error in self.sync_errors['mailchimp']}
+        unconfirmed = sum(batch_sizes[batch_id] for batch_id in pending + unreadable)
+        success_count = max(0, len(members) - len(failed_emails) - unconfirmed)
+        for error in self.sync_errors['mailchimp'][:20]:
+            logger.warning(f"Mailchimp member error for {error['email']}: {error['error']}")
+        logger.info(f"Synced {success_count} leads to Mailchimp in {len(batch_sizes)} batches "
+                    f"({len(failed_emails)} failed, {unconfirmed} unconfirmed)")
+        # Unconfirmed members count as failed, so the leads are retried rather than marked processed
+        self.sync_counts['mailchimp'] = {'synced': success_count, 'failed': len(failed_emails) + unconfirmed}
+        return success_count > 0
+    
+    def _collect_mailchimp_errors(self, response_body_url: str, emails_by_hash: Dict[str, str]) -> List[Dict]:
+        """Read a finished batch's result archive and return its failed member operations"""
+        import io
+        import tarfile
+        
+        errors = []
+        response = self._http('mailchimp', 'GET', response_body_url)
+        response.raise_for_status()
+        with tarfile.open(fileobj=io.BytesIO(response.content), mode='r:gz') as archive:
+            for entry in archive.getmembers():
+                if not entry.isfile():
+                    continue
+                for result in json.load(archive.extractfile(entry)):
+                    if result.get('status_code', 200) < 400:
+                        continue
+                    member_hash = str(result.get('operation_id', '')).split(':')[0]
+                    try:
+                        detail = json.loads(result.get('response') or '{}').get('detail', '')
+                    except ValueError:
+                        detail = result.get('response', '')
+                    errors.append({
+                        'email': emails_by_hash.get(member_hash, member_hash),
+                        'status_code': result['status_code'],
+                        'error': detail,
+                    })
+        return errors
+    
+    def sync_to_twilio(self, df: pd.DataFrame, message: str = None, campaign: str = None) -> bool:
+        """Send SMS to leads via Twilio
+        
+        Messages go out on twilio_workers threads, paced by the
+        twilio_rate_limit governor. Every number is recorded in the send
+        ledger under the campaign, so a rerun skips numbers already messaged.
+        Returns True when every number was already messaged (or there are
+        none), as there is nothing to send.
+        """
         if not self.config['twilio_account_sid'] or self.config['twilio_account_sid'] == 'YOUR_TWILIO_SID':
             logger.warning("Twilio credentials not configured")
             return False
-            
-        from twilio.rest import Client
         
         if not message:
             message = """Stop Foreclosure Fast: We can help you avoid foreclosure and get cash for your home in 7 days. Call (555) STOP-NOW for a free consultation. Reply STOP to opt out."""
+        campaign = campaign or self.config['twilio_campaign'] or f"sms-{hashlib.md5(message.encode()).hexdigest()[:12]}"
         
-        client = Client(self.config['twilio_account_sid'], self.config['twilio_auth_token'])
-        success_count = 0
+        phones = df['phone'].dropna().astype(str) if 'phone' in df.columns else pd.Series([], dtype=object)
+        phones = list(dict.fromkeys(phones[phones.str.len() >= 10].tolist()))
+        already_sent = self.send_ledger.already_sent(phones, campaign)
+        to_send = [phone for phone in phones if phone not in already_sent]
+        if already_sent:
+            logger.info(f"Skipping {len(already_sent)} numbers already messaged for campaign {campaign}")
         
-        for _, row in df.iterrows():
-            phone = row.get('phone')
-            if not phone or len(phone) < 10:
-                continue
-                
-            try:
-                message_obj = client.messages.create(
-                    body=message,
-                    from_=self.config['twilio_phone_number'],
-                    to=phone
-                )
-                success_count += 1
-                time.sleep(1)  # Rate limiting
-                
-            except Exception as e:
-                logger.error(f"Twilio SMS error for {phone}: {str(e)}")
+        self.sync_errors['twilio'] = []
+        if not to_send:
+            logger.info("No new numbers to message via Twilio")
+            self.sync_counts['twilio'] = {'synced': 0, 'failed': 0}
+            return True
+        with ThreadPoolExecutor(max_workers=max(1, self.config['twilio_workers'])) as pool:
+            results = list(pool.map(lambda phone: self._send_sms(phone, message, campaign), to_send))
+        success_count = sum(results)
         
         logger.info(f"Sent SMS to {success_count} leads via Twilio")
+        self.sync_counts['twilio'] = {'synced': success_count, 'failed': len(to_send) - success_count}
         return success_count > 0
     
-    def sync_to_google_ads(self, df: pd.DataFrame) -> bool:
-        """Create Google Ads Customer Match audience"""
-        if not self.config['google_ads_customer_id'] or self.config['google_ads_customer_id'] == 'YOUR_CUSTOMER_ID':
-            logger.warning("Google Ads credentials not configured")
-            return False
+    def _send_sms(self, phone: str, message: str, campaign: str, max_attempts: int = 3) -> bool:
+        """Send one message through Twilio's Messages API and record it in the ledger"""
+        url = f"{self.config['twilio_api_base']}/2010-04-01/Accounts/{self.config['twilio_account_sid']}/Messages.json"
+        data = {
+            'Body': message,
+            'From': self.config['twilio_phone_number'],
+            'To': phone
+        }
+        auth = (self.config['twilio_account_sid'], self.config['twilio_auth_token'])
+        
+        for attempt in range(max_attempts):
+            try:
+                response = self._http('twilio', 'POST', url, data=data, auth=auth)
+            except Exception as e:
+                logger.error(f"Twilio SMS error for {phone}: {str(e)}")
+                self.sync_errors['twilio'].append({'phone': phone, 'error': str(e)})
+                return False
             
+            if response.status_code in [200, 201]:
+                self.send_ledger.record(phone, campaign, 'sent', sid=self._json_field(response, 'sid'))
+                return True
+            if response.status_code == 429 or response.status_code >= 500:
+                # Throttled or transient; back off and retry without recording
+                time.sleep(2 ** attempt)
+                continue
+            
+            # Permanent rejection (invalid number, opted out, ...): record so reruns skip it
+            error = self._json_field(response, 'message', response.text or str(response.status_code))
+            logger.error(f"Twilio SMS error for {phone}: {error}")
+            self.send_ledger.record(phone, campaign, 'failed', error=error)
+            self.sync_errors['twilio'].append({'phone': phone, 'status_code': response.status_code, 'error': error})
+            return False
+        
+        logger.error(f"Twilio SMS error for {phone}: still throttled after {max_attempts} attempts")
+        self.sync_errors['twilio'].append({'phone': phone, 'error': 'throttled'})
+        return False
+    
+    @staticmethod
+    def _json_field(response: requests.Response, field: str, default=None):
+        """field of a JSON object body, or default when the body is not one (e.g. an HTML 403 from a proxy)"""
         try:
+            body = response.json()
+        except ValueError:
+            return default
+        return body.get(field, default) if isinstance(body, dict) else default
+    
+    def _google_ads_members(self, df: pd.DataFrame) -> Dict[str, Dict]:
+        """Hashed Customer Match identifiers per lead, keyed by a member key"""
+        df = self._with_match_keys(df)
+        members = {}
+        for email_hash, phone_hash in zip(df['email_sha256'].tolist(), df['phone_sha256'].tolist()):
+            identifiers = {}
+            if email_hash:
+                identifiers['hashed_email'] = email_hash
+            if phone_hash:
+                identifiers['hashed_phone_number'] = phone_hash
+            if identifiers:
+                member_key = hashlib.md5(json.dumps(identifiers, sort_keys=True).encode()).hexdigest()
+                members[member_key] = identifiers
+        return members
+    
+    def _google_ads_client(self):
+        """The Google Ads client, built once and reused by every later sync"""
+        if self._google_ads is None:
             from google.ads.googleads.client import GoogleAdsClient
             
-            # Initialize client
             credentials = {
                 'developer_token': self.config['google_ads_developer_token'],
                 'client_id': self.config['google_ads_client_id'],
                 'client_secret': self.config['google_ads_client_secret'],
                 'refresh_token': self.config['google_ads_refresh_token'],
             }
-            
-            client = GoogleAdsClient.load_from_dict(credentials)
-            user_list_service = client.get_service("UserListService")
-            
-            # Create user list
-            user_list_operation = client.get_type("UserListOperation")
-            user_list = user_list_operation.create
-            user_list.name = f"Foreclosure Leads {datetime.now().strftime('%Y-%m-%d')}"
-            user_list.description = "Pre-foreclosure homeowners from Retran.com"
-            user_list.membership_status = client.enums.UserListMembershipStatusEnum.OPEN
-            user_list.membership_life_span = 365
-            
-            crm_based_user_list = user_list.crm_based_user_list
-            crm_based_user_list.upload_key_type = client.enums.CustomerMatchUploadKeyTypeEnum.CONTACT_INFO
-            
+            self._google_ads = GoogleAdsClient.load_from_dict(credentials)
+        return self._google_ads
+    
+    def _create_google_ads_user_list(self, client, name: str) -> str:
+        user_list_service = client.get_service("UserListService")
+        
+        user_list_operation = client.get_type("UserListOperation")
+        user_list = user_list_operation.create
+        user_list.name = name
+        user_list.description = "Pre-foreclosure homeowners from Retran.com"
+        user_list.membership_status = client.enums.UserListMembershipStatusEnum.OPEN
+        user_list.membership_life_span = 365
+        
+        crm_based_user_list = user_list.crm_based_user_list
+        crm_based_user_list.upload_key_type = client.enums.CustomerMatchUploadKeyTypeEnum.CONTACT_INFO
+        
+        with self.metrics.call('google_ads'):
             response = user_list_service.mutate_user_lists(
                 customer_id=self.config['google_ads_customer_id'],
                 operations=[user_list_operation]
             )
+        return response.results[0].resource_name
+    
+    def sync_to_google_ads(self, df: pd.DataFrame, incremental: bool = None, remove_missing: bool = False) -> bool:
+        """Create Google Ads Customer Match audience
+        
+        In incremental mode (google_ads_incremental) one persistent user list
+        is reused and only members not uploaded before are added; with
+        remove_missing, previously uploaded members absent from df are
+        removed, so pass a full snapshot of leads in that case. Operations
+        are streamed in google_ads_chunk_size requests with partial failure
+        enabled.
+        """
+        if not self.config['google_ads_customer_id'] or self.config['google_ads_customer_id'] == 'YOUR_CUSTOMER_ID':
+            logger.warning("Google Ads credentials not configured")
+            return False
+        
+        if incremental is None:
+            incremental = self.config['google_ads_incremental']
+        self.sync_errors['google_ads'] = []
             
-            user_list_resource_name = response.results[0].resource_name
+        try:
+            client = self._google_ads_client()
+            members = self._google_ads_members(df)
             
-            # Add members to user list
-            offline_user_data_job_service = client.get_service("OfflineUserDataJobService")
+            if incremental:
+                user_list_resource_name = self.config['google_ads_user_list'] or self.audience_store.get_audience('google_ads')
+                if not user_list_resource_name:
+                    user_list_resource_name = self._create_google_ads_user_list(client, "Foreclosure Leads")
+                    self.audience_store.set_audience('google_ads', user_list_resource_name)
+                add_keys, removals = self.audience_store.diff(
+                    'google_ads', user_list_resource_name, members, include_removals=remove_missing
+                )
+                additions = {key: members[key] for key in add_keys}
+            else:
+                # Reuse the user list created earlier in this run (streaming chunks)
+                user_list_resource_name = self.audience_ids.get('google_ads')
+                if not user_list_resource_name:
+                    user_list_resource_name = self._create_google_ads_user_list(
+                        client, f"Foreclosure Leads {datetime.now().strftime('%Y-%m-%d')}"
+                    )
+                    self.audience_ids['google_ads'] = user_list_resource_name
+                additions, removals = members, {}
+            
+            if not additions and not removals:
+                logger.info("Google Ads audience already up to date")
+                self.sync_counts['google_ads'] = {'synced': 0, 'failed': 0}
+                return True
+            
+            added, removed = self._run_google_ads_job(client, user_list_resource_name, additions, removals)
             
-            # Create job
-            offline_user_data_job = client.get_type("OfflineUserDataJob")
-            offline_user_data_job.type_ = client.enums.OfflineUserDataJobTypeEnum.CUSTOMER_MATCH_USER_LIST
-            offline_user_data_job.customer_match_user_list_metadata.user_list = user_list_resource_name
+            if incremental:
+                self.audience_store.add_members('google_ads', user_list_resource_name,
+                                                {key: additions[key] for key in added})
+                self.audience_store.remove_members('google_ads', user_list_resource_name, removed)
             
+            failed = len(additions) + len(removals) - len(added) - len(removed)
+            logger.info(f"Updated Google Ads audience: {len(added)} added, {len(removed)} removed, {failed} failed")
+            self.sync_counts['google_ads'] = {'synced': len(added) + len(removed), 'failed': failed}
+            return bool(added or removed)
+            
+        except Exception as e:
+            logger.error(f"Google Ads sync error: {str(e)}")
+            return False
+    
+    def _run_google_ads_job(self, client, user_list_resource_name: str, additions: Dict[str, Dict],
+                            removals: Dict[str, Dict]) -> tuple:
+        """Upload additions/removals through one offline user data job
+        
+        Returns the (added, removed) member keys that were accepted.
+        """
+        offline_user_data_job_service = client.get_service("OfflineUserDataJobService")
+        
+        # Create job
+        offline_user_data_job = client.get_type("OfflineUserDataJob")
+        offline_user_data_job.type_ = client.enums.OfflineUserDataJobTypeEnum.CUSTOMER_MATCH_USER_LIST
+        offline_user_data_job.customer_match_user_list_metadata.user_list = user_list_resource_name
+        
+        with self.metrics.call('google_ads'):
             create_offline_user_data_job_response = offline_user_data_job_service.create_offline_user_data_job(
                 customer_id=self.config['google_ads_customer_id'],
                 job=offline_user_data_job
             )
-            
-            job_resource_name = create_offline_user_data_job_response.resource_name
-            
-            # Prepare user data
+        job_resource_name = create_offline_user_data_job_response.resource_name
+        
+        items = [('remove', key, ids) for key, ids in removals.items()] + \
+                [('create', key, ids) for key, ids in additions.items()]
+        chunk_size = max(1, self.config['google_ads_chunk_size'])
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        
+        def upload_chunk(chunk: List[tuple]) -> List[tuple]:
+            # Operations are only built for the chunks currently being sent
             operations = []
-            for _, row in df.iterrows():
-                if pd.isna(row.get('email')) and pd.isna(row.get('phone')):
-                    continue
-                    
+            for action, _, identifiers in chunk:
                 operation = client.get_type("OfflineUserDataJobOperation")
-                user_data = operation.create
-                
-                if pd.notna(row.get('email')):
-                    user_identifier = client.get_type("UserIdentifier")
-                    user_identifier.hashed_email = hashlib.sha256(row['email'].lower().encode()).hexdigest()
-                    user_data.user_identifiers.append(user_identifier)
-                
-                if pd.notna(row.get('phone')):
+                user_data = operation.remove if action == 'remove' else operation.create
+                for field, value in identifiers.items():
                     user_identifier = client.get_type("UserIdentifier")
-                    user_identifier.hashed_phone_number = hashlib.sha256(row['phone'].encode()).hexdigest()
+                    setattr(user_identifier, field, value)
                     user_data.user_identifiers.append(user_identifier)
-                
                 operations.append(operation)
             
-            # Upload data
-            offline_user_data_job_service.add_offline_user_data_job_operations(
-                resource_name=job_resource_name,
-                operations=operations
-            )
-            
-            # Run the job
-            offline_user_data_job_service.run_offline_user_data_job(resource_name=job_resource_name)
+            request = client.get_type("AddOfflineUserDataJobOperationsRequest")
+            request.resource_name = job_resource_name
+            request.enable_partial_failure = True
+            request.operations = operations
             
-            logger.info(f"Created Google Ads audience with {len(operations)} members")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Google Ads sync error: {str(e)}")
-            return False
-    
-    def sync_to_facebook_ads(self, df: pd.DataFrame) -> bool:
-        """Create Facebook Custom Audience"""
-        if not self.config['facebook_access_token'] or self.config['facebook_access_token'] == 'YOUR_FB_ACCESS_TOKEN':
-            logger.warning("Facebook Ads credentials not configured")
-            return False
+            try:
+                with self.metrics.call('google_ads'):
+                    response = offline_user_data_job_service.add_offline_user_data_job_operations(request=request)
+            except Exception as e:
+                logger.error(f"Google Ads chunk upload failed: {str(e)}")
+                self.sync_errors['google_ads'].extend({'member_key': key, 'error': str(e)} for _, key, _ in chunk)
+                return []
             
-        import hashlib
+            failed_indexes = self._google_ads_partial_failures(client, response, chunk)
+            return [item for i, item in enumerate(chunk) if i not in failed_indexes]
         
-        url = f"https://graph.facebook.com/v18.0/{self.config['facebook_ad_account_id']}/customaudiences"
+        accepted = []
+        with ThreadPoolExecutor(max_workers=max(1, self.config['google_ads_upload_workers'])) as pool:
+            for chunk_accepted in pool.map(upload_chunk, chunks):
+                accepted.extend(chunk_accepted)
         
-        # Create custom audience
+        # Run the job
+        if accepted:
+            with self.metrics.call('google_ads'):
+                offline_user_data_job_service.run_offline_user_data_job(resource_name=job_resource_name)
+        
+        added = [key for action, key, _ in accepted if action == 'create']
+        removed = [key for action, key, _ in accepted if action == 'remove']
+        return added, removed
+    
+    def _google_ads_partial_failures(self, client, response, chunk: List[tuple]) -> Set[int]:
+        """Indexes of operations rejected in a partial-failure response, recorded in sync_errors"""
+        partial_failure = getattr(response, 'partial_failure_error', None)
+        if not partial_failure or not partial_failure.code:
+            return set()
+        
+        failed_indexes = set()
+        failure_type = type(client.get_type("GoogleAdsFailure"))
+        for detail in partial_failure.details:
+            failure = failure_type.deserialize(detail.value)
+            for error in failure.errors:
+                index = error.location.field_path_elements[0].index
+                failed_indexes.add(index)
+                self.sync_errors['google_ads'].append({'member_key': chunk[index][1], 'error': error.message})
+        logger.warning(f"Google Ads rejected {len(failed_indexes)} of {len(chunk)} operations in a chunk")
+        return failed_indexes
+    
+    def _facebook_members(self, df: pd.DataFrame) -> Dict[str, List[str]]:
+        """Hashed rows in FACEBOOK_SCHEMA order, keyed by a member key"""
+        df = self._with_match_keys(df)
+        members = {}
+        for row in df[['email_sha256', 'phone_sha256', 'fn_sha256', 'ln_sha256']].itertuples(index=False, name=None):
+            if any(row):
+                members[hashlib.md5('|'.join(row).encode()).hexdigest()] = list(row)
+        return members
+    
+    def _create_facebook_audience(self, name: str) -> Optional[str]:
+        url = f"{self.config['facebook_graph_base']}/{self.config['facebook_ad_account_id']}/customaudiences"
         audience_data = {
-            'name': f'Foreclosure Leads {datetime.now().strftime("%Y-%m-%d")}',
+            'name': name,
             'subtype': 'CUSTOM',
             'description': 'Pre-foreclosure homeowners from Retran.com',
             'customer_file_source': 'USER_PROVIDED_ONLY',
             'access_token': self.config['facebook_access_token']
         }
         
+        response = self._http('facebook', 'POST', url, data=audience_data)
+        if response.status_code != 200:
+            logger.error(f"Facebook audience creation failed: {response.text}")
+            return None
+        return response.json()['id']
+    
+    def sync_to_facebook_ads(self, df: pd.DataFrame, incremental: bool = None, remove_missing: bool = False) -> bool:
+        """Create Facebook Custom Audience
+        
+        Users are hashed into a fixed-schema matrix and uploaded in capped
+        batches under one upload session, sent concurrently with retries. In
+        incremental mode (facebook_incremental) one persistent audience is
+        reused and only users not uploaded before are added; with
+        remove_missing, users absent from df are removed from it.
+        """
+        if not self.config['facebook_access_token'] or self.config['facebook_access_token'] == 'YOUR_FB_ACCESS_TOKEN':
+            logger.warning("Facebook Ads credentials not configured")
+            return False
+        
+        if incremental is None:
+            incremental = self.config['facebook_incremental']
+        self.sync_errors['facebook_ads'] = []
+        
         try:
-            response = requests.post(url, data=audience_data)
-            if response.status_code != 200:
-                logger.error(f"Facebook audience creation failed: {response.text}")
-                return False
-                
-            audience_id = response.json()['id']
+            members = self._facebook_members(df)
             
-            # Prepare user data
-            users = []
-            for _, row in df.iterrows():
-                user = {}
-                
-                if pd.notna(row.get('email')):
-                    user['email'] = hashlib.sha256(row['email'].lower().encode()).hexdigest()
-                
-                if pd.notna(row.get('phone')):
-                    user['phone'] = hashlib.sha256(row['phone'].encode()).hexdigest()
-                
-                if pd.notna(row.get('owner_name')):
-                    name_parts = row['owner_name'].split()
-                    if name_parts:
-                        user['fn'] = hashlib.sha256(name_parts[0].lower().encode()).hexdigest()
-                    if len(name_parts) > 1:
-                        user['ln'] = hashlib.sha256(' '.join(name_parts[1:]).lower().encode()).hexdigest()
-                
-                if user:
-                    users.append(user)
+            if incremental:
+                audience_id = self.config['facebook_audience_id'] or self.audience_store.get_audience('facebook_ads')
+                if not audience_id:
+                    audience_id = self._create_facebook_audience('Foreclosure Leads')
+                    if not audience_id:
+                        return False
+                    self.audience_store.set_audience('facebook_ads', audience_id)
+                add_keys, removals = self.audience_store.diff(
+                    'facebook_ads', audience_id, members, include_removals=remove_missing
+                )
+                additions = {key: members[key] for key in add_keys}
+            else:
+                # Reuse the audience created earlier in this run (streaming chunks)
+                audience_id = self.audience_ids.get('facebook_ads')
+                if not audience_id:
+                    audience_id = self._create_facebook_audience(f'Foreclosure Leads {datetime.now().strftime("%Y-%m-%d")}')
+                    if not audience_id:
+                        return False
+                    self.audience_ids['facebook_ads'] = audience_id
+                additions, removals = members, {}
             
-            # Upload users to audience
-            upload_url = f"https://graph.facebook.com/v18.0/{audience_id}/users"
+            if not additions and not removals:
+                logger.info("Facebook Custom Audience already up to date")
+                self.sync_counts['facebook_ads'] = {'synced': 0, 'failed': 0}
+                return True
+            
+            added = self._upload_facebook_users(audience_id, additions, 'POST')
+            removed = self._upload_facebook_users(audience_id, removals, 'DELETE')
+            
+            if incremental:
+                self.audience_store.add_members('facebook_ads', audience_id, {key: additions[key] for key in added})
+                self.audience_store.remove_members('facebook_ads', audience_id, removed)
+            
+            failed = len(additions) + len(removals) - len(added) - len(removed)
+            logger.info(f"Updated Facebook Custom Audience: {len(added)} added, {len(removed)} removed, {failed} failed")
+            self.sync_counts['facebook_ads'] = {'synced': len(added) + len(removed), 'failed': failed}
+            return bool(added or removed)
+                
+        except Exception as e:
+            logger.error(f"Facebook Ads sync error: {str(e)}")
+            return False
+    
+    def _upload_facebook_users(self, audience_id: str, members: Dict[str, List[str]], method: str) -> List[str]:
+        """Send members to /{audience_id}/users in batches under one session
+        
+        Every batch but the last is sent concurrently; the last one carries
+        last_batch_flag and goes out once the others are done. Returns the
+        member keys in accepted batches.
+        """
+        if not members:
+            return []
+        
+        keys = list(members)
+        batch_size = max(1, self.config['facebook_batch_size'])
+        batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+        session_id = int.from_bytes(os.urandom(6), 'big')
+        url = f"{self.config['facebook_graph_base']}/{audience_id}/users"
+        
+        def send(batch_seq: int) -> List[str]:
+            batch_keys = batches[batch_seq - 1]
             upload_data = {
                 'payload': {
-                    'schema': list(users[0].keys()) if users else [],
-                    'data': [list(user.values()) for user in users]
+                    'schema': self.FACEBOOK_SCHEMA,
+                    'data': [members[key] for key in batch_keys]
+                },
+                'session': {
+                    'session_id': session_id,
+                    'batch_seq': batch_seq,
+                    'last_batch_flag': batch_seq == len(batches),
+                    'estimated_num_total': len(keys)
                 },
                 'access_token': self.config['facebook_access_token']
             }
             
-            upload_response = requests.post(upload_url, json=upload_data)
+            error = None
+            for attempt in range(max(1, self.config['facebook_max_retries'])):
+                try:
+                    response = self._http('facebook', method, url, json=upload_data)
+                except Exception as e:
+                    error = str(e)
+                else:
+                    if response.status_code == 200:
+                        result = response.json()
+                        if result.get('num_invalid_entries'):
+                            logger.warning(f"Facebook batch {batch_seq}: {result['num_invalid_entries']} invalid entries")
+                            self.sync_errors['facebook_ads'].append({
+                                'batch_seq': batch_seq,
+                                'num_invalid_entries': result['num_invalid_entries'],
+                                'error': result.get('invalid_entry_samples'),
+                            })
+                        return batch_keys
+                    error = response.text
+                    if response.status_code < 500 and response.status_code != 429:
+                        break
+                time.sleep(2 ** attempt)
             
-            if upload_response.status_code == 200:
-                logger.info(f"Created Facebook Custom Audience with {len(users)} members")
-                return True
-            else:
-                logger.error(f"Facebook user upload failed: {upload_response.text}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Facebook Ads sync error: {str(e)}")
-            return False
+            logger.error(f"Facebook user {method} batch {batch_seq} failed: {error}")
+            self.sync_errors['facebook_ads'].append({'batch_seq': batch_seq, 'members': len(batch_keys), 'error': error})
+            return []
+        
+        accepted = []
+        with ThreadPoolExecutor(max_workers=max(1, self.config['facebook_upload_workers'])) as pool:
+            for batch_accepted in pool.map(send, range(1, len(batches))):
+                accepted.extend(batch_accepted)
+        accepted.extend(send(len(batches)))
+        return accepted
     
-    def process_daily_leads(self, file_path: str, output_file: str = None) -> str:
-        """Main processing function"""
+    def process_daily_leads(self, file_path: str, output_file: str = None, chunksize: int = None,
+                            skip_processed: bool = True) -> str:
+        """Main processing function
+        
+        With chunksize set, the file is processed as a stream of chunks so
+        memory use stays flat regardless of the input size. With
+        skip_processed, leads already in the lead index from earlier runs
+        are dropped before enrichment and sync. The per-destination sync
+        results are left in self.sync_results. Output goes to output_file
+        as CSV and/or to the date-partitioned Parquet dataset, as set by
+        output_format.
+        
+        With checkpoint_dir set, each stage of a whole-file run is
+        checkpointed under the input file's hash and a rerun on the same
+        file resumes after the last completed stage (within enrichment,
+        after the last completed batch). The checkpoint is removed once
+        every destination has synced. Streaming runs resume through the lead
+        index instead: a chunk is marked processed only once every
+        configured destination synced it, so after an outage the rerun
+        skips the chunks that went through and retries the rest.
+        """
         logger.info(f"Starting daily lead processing for {file_path}")
+        self.audience_ids = {}
+        self.sync_results = {}
+        self.metrics = PipelineMetrics()
+        run_started = self.run_started = datetime.now()
+        
+        if not output_file:
+            timestamp = run_started.strftime('%Y%m%d_%H%M%S')
+            output_file = f'enriched_leads_{timestamp}.csv'
         
         try:
-            # Load and clean data
-            raw_df = self.load_retran_data(file_path)
-            cleaned_df = self.clean_and_standardize(raw_df)
+            if chunksize:
+                return self._process_streaming(file_path, output_file, chunksize, skip_processed, run_started)
             
-            # Enrich with emails
-            enriched_df = self.enrich_leads(cleaned_df)
+            checkpoint = None
+            if self.config['checkpoint_dir']:
+                RunCheckpoint.prune(self.config['checkpoint_dir'], self.config['checkpoint_max_age'])
+                checkpoint = RunCheckpoint(self.config['checkpoint_dir'], file_path)
+                if checkpoint.state['stages']:
+                    logger.info(f"Resuming run from checkpoint {checkpoint.directory}")
             
-            # Sync to marketing platforms
-            logger.info("Syncing to marketing platforms...")
-            self.sync_to_mailchimp(enriched_df)
-            time.sleep(2)
-            
-            self.sync_to_twilio(enriched_df)
-            time.sleep(2)
+            # Load and clean data
+            raw_df = self._run_stage(checkpoint, 'load', lambda: self.load_retran_data(file_path))
             
-            self.sync_to_google_ads(enriched_df)
-            time.sleep(2)
+            def clean() -> pd.DataFrame:
+                cleaned_df = self.clean_and_standardize(raw_df)
+                # Only new or changed leads go to the paid stages
+                if skip_processed and self.lead_index is not None:
+                    cleaned_df = self.lead_index.filter_new(cleaned_df)
+                return cleaned_df
+            cleaned_df = self._run_stage(checkpoint, 'clean', clean, rows=len(raw_df))
             
-            self.sync_to_facebook_ads(enriched_df)
+            return self._enrich_sync_and_save(cleaned_df, checkpoint, output_file, run_started)
             
-            # Save enriched data
-            if not output_file:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_file = f'enriched_leads_{timestamp}.csv'
+        except Exception as e:
+            logger.error(f"Error in daily processing: {str(e)}")
+            raise
+        
+        finally:
+            self._export_metrics(run_started)
+    
+    @classmethod
+    def _batch_files(cls, inputs: Union[str, List[str]]) -> List[str]:
+        """Retran files named by inputs: files, directories and glob patterns, sorted and deduplicated"""
+        files = []
+        for pattern in [inputs] if isinstance(inputs, str) else inputs:
+            if os.path.isdir(pattern):
+                files.extend(os.path.join(pattern, name) for name in os.listdir(pattern))
+            else:
+                files.extend(glob.glob(pattern))
+        return sorted({os.path.abspath(path) for path in files
+                       if os.path.isfile(path) and path.lower().endswith(cls.RETRAN_EXTENSIONS)})
+    
+    def process_batch(self, inputs: Union[str, List[str]], output_file: str = None, workers: int = None,
+                      skip_processed: bool = True) -> str:
+        """Process several Retran downloads (e.g. one per county) as one run
+        
+        inputs is a directory, a glob pattern or a list of either. Files are
+        loaded and cleaned in parallel across batch_workers processes, then
+        deduplicated against each other, so a lead appearing in two county
+        pulls is kept once (from the first file in name order). The merged
+        leads go through enrichment, sync and output once, as in
+        process_daily_leads. Each lead keeps its input file name in
+        source_file. Batch runs are not checkpointed; the lead index still
+        skips leads that finished in an earlier run.
+        """
+        files = self._batch_files(inputs)
+        if not files:
+            raise FileNotFoundError(f"No Retran files found in {inputs}")
+        
+        logger.info(f"Starting batch lead processing for {len(files)} files")
+        self.audience_ids = {}
+        self.sync_results = {}
+        self.metrics = PipelineMetrics()
+        run_started = self.run_started = datetime.now()
+        
+        if not output_file:
+            timestamp = run_started.strftime('%Y%m%d_%H%M%S')
+            output_file = f'enriched_leads_{timestamp}.csv'
+        
+        try:
+            # Load and clean every file in its own process
+            workers = min(workers or self.config['batch_workers'], len(files))
+            with self.metrics.stage('load_clean') as stage:
+                if workers > 1:
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        results = list(pool.map(_load_and_clean_file, [self.config] * len(files), files,
+                                                [run_started] * len(files)))
+                else:
+                    results = [_load_and_clean_file(self.config, file_path, run_started) for file_path in files]
+                stage['rows'] = sum(raw_rows for raw_rows, _ in results)
             
-            enriched_df.to_csv(output_file, index=False)
-            logger.info(f"Processed leads saved to {output_file}")
+            # Dedupe across files, then drop leads finished in earlier runs
+            with self.metrics.stage('clean') as stage:
+                frames = [cleaned_df for _, cleaned_df in results]
+                # Share categories between files so the merged columns stay categorical
+                for col in self.CATEGORY_COLUMNS + ['source_file']:
+                    if all(col in frame.columns for frame in frames):
+                        categories = pd.api.types.union_categoricals([frame[col] for frame in frames]).categories
+                        for frame in frames:
+                            frame[col] = frame[col].cat.set_categories(categories)
+                combined_df = pd.concat(frames, ignore_index=True)
+                stage['rows'] = len(combined_df)
+                keep = self._drop_duplicates(combined_df, combined_df['lead_key'],
+                                             pd.Series(True, index=combined_df.index))
+                cleaned_df = combined_df[keep.values]
+                if skip_processed and self.lead_index is not None:
+                    cleaned_df = self.lead_index.filter_new(cleaned_df)
+                stage['frame'] = cleaned_df
+            logger.info(f"Merged {len(files)} files: {len(combined_df) - int(keep.sum())} cross-file duplicates dropped, "
+                        f"{len(cleaned_df)} leads to process")
             
-            return output_file
+            return self._enrich_sync_and_save(cleaned_df, None, output_file, run_started)
             
         except Exception as e:
-            logger.error(f"Error in daily processing: {str(e)}")
+            logger.error(f"Error in batch processing: {str(e)}")
             raise
+        
+        finally:
+            self._export_metrics(run_started)
+    
+    def warm_up(self):
+        """Open the local stores and build the platform clients ahead of the first file"""
+        for store in ['lead_index', 'enrichment_cache', 'send_ledger', 'audience_store', 'match_key_cache']:
+            getattr(self, store)
+        if self._use_arrow_csv():
+            import pyarrow.compute  # noqa: F401
+        if self._has_credentials('google_ads'):
+            try:
+                self._google_ads_client()
+            except Exception as e:
+                logger.error(f"Error building Google Ads client: {str(e)}")
+    
+    def watch(self, drop_dir: str, poll_interval: float = None, stop: threading.Event = None,
+              max_files: int = None) -> List[str]:
+        """Process Retran files as they land in drop_dir, until stop is set
+        
+        One long-lived processor keeps its pooled HTTP sessions, Google Ads
+        client, rate limiters, enrichment cache (including the in-memory
+        LRU) and other local stores open between files, so each new file
+        starts processing immediately instead of paying the startup cost of
+        a fresh run. A file is picked up once its size and mtime have been
+        unchanged for watch_settle_seconds, oldest first. It is then moved
+        to drop_dir/processed, or drop_dir/failed if its run raised, and its
+        output is written to watch_output_dir. Returns the output paths,
+        once stop is set or after max_files files.
+        """
+        poll_interval = self.config['watch_poll_interval'] if poll_interval is None else poll_interval
+        stop = stop or threading.Event()
+        output_dir = self.config['watch_output_dir'] or os.path.join(drop_dir, 'output')
+        for directory in [output_dir, os.path.join(drop_dir, 'processed'), os.path.join(drop_dir, 'failed')]:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.warm_up()
+        logger.info(f"Watching {drop_dir} for Retran files every {poll_interval}s")
+        
+        outputs = []
+        last_seen = {}
+        processed_count = 0
+        while not stop.is_set():
+            now = time.time()
+            ready = []
+            for file_path in self._batch_files(drop_dir):
+                try:
+                    info = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                signature = (info.st_size, info.st_mtime)
+                if last_seen.get(file_path, (None, now))[0] != signature:
+                    last_seen[file_path] = (signature, now)
+                elif now - last_seen[file_path][1] >= self.config['watch_settle_seconds']:
+                    ready.append((info.st_mtime, file_path))
+            
+            for _, file_path in sorted(ready):
+                if stop.is_set():
+                    break
+                last_seen.pop(file_path, None)
+                name = os.path.basename(file_path)
+                stem = os.path.splitext(name)[0]
+                output_file = os.path.join(output_dir, f"enriched_{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+                try:
+                    outputs.append(self.process_daily_leads(file_path, output_file=output_file,
+                                                            chunksize=self.config['chunk_size'] or None))
+                    shutil.move(file_path, os.path.join(drop_dir, 'processed', name))
+                except Exception as e:
+                    logger.error(f"Error processing {name}, moved to failed: {str(e)}")
+                    shutil.move(file_path, os.path.join(drop_dir, 'failed', name))
+                processed_count += 1
+                if max_files and processed_count >= max_files:
+                    stop.set()
+            
+            stop.wait(poll_interval)
+        
+        logger.info(f"Stopped watching {drop_dir} after {processed_count} files")
+        return outputs
+    
+    def _enrich_sync_and_save(self, cleaned_df: pd.DataFrame, checkpoint: Optional[RunCheckpoint], output_file: str,
+                              run_started: datetime) -> str:
+        """Enrich, hash, sync and write the cleaned leads of a whole-file or batch run"""
+        # Enrich with emails, checkpointing every checkpoint_batch_size rows
+        enriched_df = self._run_stage(checkpoint, 'enrich', lambda: self._enrich_in_batches(cleaned_df, checkpoint))
+        
+        # Hash match keys once for every sync
+        with self.metrics.stage('hash') as stage:
+            enriched_df = self.hash_match_keys(enriched_df)
+            stage['rows'] = len(enriched_df)
+            stage['frame'] = enriched_df
+        
+        # Sync to marketing platforms; destinations that finished on an earlier attempt are skipped
+        pending = [destination for destination in self.SYNC_DESTINATIONS
+                   if checkpoint is None or not checkpoint.done(f'sync-{destination}')]
+        with self.metrics.stage('sync') as stage:
+            results = self.sync_all(enriched_df, destinations=pending)
+            stage['rows'] = len(enriched_df)
+        for destination, result in results.items():
+            if checkpoint is not None and result['status'] in ['ok', 'skipped']:
+                checkpoint.complete(f'sync-{destination}', result)
+        if checkpoint is not None:
+            self.sync_results = {
+                destination: results.get(destination) or checkpoint.result(f'sync-{destination}')
+                for destination in self.SYNC_DESTINATIONS
+            }
+        
+        self._mark_processed(enriched_df, self.sync_results)
+        
+        # Save enriched data
+        with self.metrics.stage('output') as stage:
+            output_path = self._write_output(enriched_df, output_file, run_started)
+            stage['rows'] = len(enriched_df)
+        logger.info(f"Processed leads saved to {output_path}")
+        
+        if checkpoint is not None:
+            failed = [destination for destination in self.SYNC_DESTINATIONS
+                      if not checkpoint.done(f'sync-{destination}')]
+            if failed:
+                logger.warning(f"Sync incomplete for {', '.join(failed)}; rerun to resume from the sync stage")
+            else:
+                checkpoint.clear()
+        
+        return output_path
+    
+    def _mark_processed(self, df: pd.DataFrame, results: Dict[str, Dict]):
+        """Record leads in the lead index once every configured destination has them
+        
+        If any destination did not sync every lead (partial, failed, error or
+        timeout), the leads stay out of the index so the next run picks them up again. The
+        destinations that did sync will not double-send on that retry:
+        Mailchimp upserts, Twilio checks the send ledger, and the ad syncs
+        upload only members missing from the audience store.
+        """
+        if self.lead_index is None:
+            return
+        incomplete = [destination for destination, result in results.items()
+                      if result['status'] not in ['ok', 'skipped']]
+        if incomplete:
+            logger.warning(f"Not marking {len(df)} leads processed: sync incomplete for {', '.join(incomplete)}; "
+                           f"they will be retried on the next run")
+            return
+        self.lead_index.mark_processed(df)
+    
+    def _export_metrics(self, run_started: datetime):
+        """Log the per-stage memory report; write the run's JSON report and Prometheus textfile to metrics_dir"""
+        if self.metrics.stages:
+            logger.info(f"Memory by stage:\n{self.metrics.memory_summary()}")
+        if not self.config['metrics_dir']:
+            return
+        try:
+            os.makedirs(self.config['metrics_dir'], exist_ok=True)
+            report_path = os.path.join(self.config['metrics_dir'], f"run_{run_started.strftime('%Y%m%d_%H%M%S')}.json")
+            cache_stats = self._enrichment_cache.stats if self._enrichment_cache is not None else {}
+            self.metrics.write_json(report_path, {'sync': self.sync_results, 'enrichment_cache': cache_stats})
+            self.metrics.write_prometheus(
+                self.config['metrics_textfile'] or os.path.join(self.config['metrics_dir'], 'lead_processor.prom')
+            )
+            logger.info(f"Run metrics saved to {report_path}")
+        except Exception as e:
+            logger.error(f"Error exporting metrics: {str(e)}")
+    
+    def _run_stage(self, checkpoint: Optional[RunCheckpoint], stage: str, compute, rows: int = None,
+                   timed: bool = True) -> pd.DataFrame:
+        """Return the stage's checkpointed frame, or compute and checkpoint it
+        
+        The stage is timed in self.metrics against rows (default: the rows
+        it returns) unless timed is False.
+        """
+        with self.metrics.stage(stage) if timed else nullcontext({}) as info:
+            df = checkpoint.load_frame(stage) if checkpoint is not None else None
+            if df is not None:
+                logger.info(f"Loaded {stage} stage from checkpoint ({len(df)} rows)")
+            else:
+                df = compute()
+                if checkpoint is not None:
+                    checkpoint.save_frame(stage, df)
+            info['rows'] = len(df) if rows is None else rows
+            info['frame'] = df
+        return df
+    
+    def _enrich_in_batches(self, df: pd.DataFrame, checkpoint: Optional[RunCheckpoint]) -> pd.DataFrame:
+        """enrich_leads over checkpoint_batch_size row batches, each checkpointed"""
+        if checkpoint is None or df.empty:
+            return self.enrich_leads(df)
+        
+        batch_size = max(1, self.config['checkpoint_batch_size'])
+        batches = []
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            batches.append(self._run_stage(checkpoint, f'enrich-{start // batch_size:05d}',
+                                           lambda: self.enrich_leads(batch), timed=False))
+        return pd.concat(batches)
+    
+    def _has_credentials(self, destination: str) -> bool:
+        credential = self.config[self.SYNC_CREDENTIALS[destination]]
+        return bool(credential) and not credential.startswith('YOUR_')
+    
+    def sync_all(self, df: pd.DataFrame, concurrent: bool = None, destinations: List[str] = None) -> Dict[str, Dict]:
+        """Sync leads to every marketing platform
+        
+        With concurrent (the sync_concurrent default) every destination runs
+        on its own thread, bounded by its own rate limit and in-flight cap.
+        A destination still running after its sync timeout is reported as
+        timed out and left to finish in the background, so one slow or
+        failing platform never holds up the others; until it finishes, later
+        calls report that destination as timed out instead of starting it
+        again. Destinations without
+        credentials are reported as skipped; a destination with nothing to
+        send is ok with 0 synced, and one where some leads were rejected is
+        partial. Returns a result per destination
+        (all of SYNC_DESTINATIONS unless destinations is given) with status,
+        synced/failed counts, errors and duration.
+        """
+        logger.info("Syncing to marketing platforms...")
+        if concurrent is None:
+            concurrent = self.config['sync_concurrent']
+        if destinations is None:
+            destinations = list(self.SYNC_DESTINATIONS)
+        
+        results = {}
+        
+        # A second sync_to_* alongside one that timed out would share its sync_errors and sync_counts
+        for destination in destinations:
+            thread = self._sync_threads.get(destination)
+            if thread is not None and thread.is_alive():
+                logger.warning(f"{destination} sync from an earlier call is still running; not starting another")
+                results[destination] = {'status': 'timeout', 'synced': 0, 'failed': 0, 'errors': 0,
+                                        'duration': 0.0, 'error': 'previous sync still running'}
+        runnable = [destination for destination in destinations if destination not in results]
+        
+        def run(destination: str):
+            started = time.monotonic()
+            if not self._has_credentials(destination):
+                results[destination] = {'status': 'skipped', 'synced': 0, 'failed': 0, 'errors': 0,
+                                        'duration': 0.0, 'error': 'not configured'}
+                return
+            self.sync_counts.pop(destination, None)
+            with self.metrics.stage(f'sync_{destination}') as stage:
+                stage['rows'] = len(df)
+                try:
+                    ok, error = getattr(self, self.SYNC_DESTINATIONS[destination])(df), None
+                except Exception as e:
+                    logger.error(f"{destination} sync error: {str(e)}")
+                    ok, error = False, str(e)
+            counts = self.sync_counts.get(destination, {})
+            if ok:
+                status = 'partial' if counts.get('failed') else 'ok'
+            else:
+                status = 'error' if error else 'failed'
+            results[destination] = {
+                'status': status,
+                'synced': counts.get('synced', 0),
+                'failed': counts.get('failed', 0),
+                'errors': len(self.sync_errors.get(destination, [])),
+                'duration': round(time.monotonic() - started, 3),
+                'error': error,
+            }
+        
+        if not concurrent:
+            for destination in runnable:
+                run(destination)
+        else:
+            # Daemon threads, so a hung destination cannot block interpreter exit
+            started = time.monotonic()
+            threads = {}
+            for destination in runnable:
+                threads[destination] = threading.Thread(target=run, args=(destination,),
+                                                        name=f"sync-{destination}", daemon=True)
+                threads[destination].start()
+            self._sync_threads.update(threads)
+            for destination, thread in threads.items():
+                timeout = self.config.get(f'{destination}_sync_timeout') or self.config['sync_timeout']
+                thread.join(max(0.0, started + timeout - time.monotonic()))
+                if thread.is_alive():
+                    logger.error(f"{destination} sync timed out after {timeout}s")
+                    results[destination] = {
+                        'status': 'timeout', 'synced': 0, 'failed': 0, 'errors': 0,
+                        'duration': round(time.monotonic() - started, 3), 'error': 'timed out',
+                    }
+        
+        self.sync_results = {destination: results[destination] for destination in destinations}
+        for destination, result in self.sync_results.items():
+            logger.info(f"Sync [{destination}]: {result['status']}, {result['synced']} synced, "
+                        f"{result['failed']} failed in {result['duration']}s")
+        return self.sync_results
+    
+    def iter_enriched_chunks(self, file_path: str, chunksize: int, skip_processed: bool = True) -> Iterator[pd.DataFrame]:
+        """Generator pipeline: load, clean, enrich and hash the file chunk by chunk"""
+        seen_keys = SeenKeys()
+        deduper = LeadDeduper(self.config['fuzzy_dedupe_threshold'], persistent=True,
+                              max_blocks=self.config['fuzzy_dedupe_max_blocks'])
+        chunks = self.load_retran_data(file_path, chunksize=chunksize)
+        try:
+            while True:
+                # Stage timers add up over chunks
+                with self.metrics.stage('load') as stage:
+                    raw_chunk = next(chunks, None)
+                    stage['rows'] = 0 if raw_chunk is None else len(raw_chunk)
+                    stage['frame'] = raw_chunk
+                if raw_chunk is None:
+                    break
+                
+                with self.metrics.stage('clean') as stage:
+                    cleaned_chunk = self.clean_and_standardize(raw_chunk, seen_keys=seen_keys, deduper=deduper)
+                    if skip_processed and self.lead_index is not None:
+                        cleaned_chunk = self.lead_index.filter_new(cleaned_chunk)
+                    stage['rows'] = len(raw_chunk)
+                    stage['frame'] = cleaned_chunk
+                if cleaned_chunk.empty:
+                    continue
+                
+                with self.metrics.stage('enrich') as stage:
+                    enriched_chunk = self.enrich_leads(cleaned_chunk)
+                    stage['rows'] = len(cleaned_chunk)
+                    stage['frame'] = enriched_chunk
+                with self.metrics.stage('hash') as stage:
+                    enriched_chunk = self.hash_match_keys(enriched_chunk)
+                    stage['rows'] = len(enriched_chunk)
+                    stage['frame'] = enriched_chunk
+                yield enriched_chunk
+        finally:
+            # Deletes the temporary database
+            seen_keys.close()
+    
+    def _write_output(self, df: pd.DataFrame, output_file: str, run_started: datetime, part: int = 0) -> str:
+        """Write enriched leads per output_format; part > 0 appends to the run's output
+        
+        Parquet goes to parquet_output_dir/run_date=YYYY-MM-DD/ as one file
+        per part, so readers can select days and columns without parsing
+        the whole archive. Returns the CSV path, or the Parquet partition
+        directory when only Parquet is written.
+        """
+        output_format = self.config['output_format']
+        if output_format not in ['csv', 'parquet', 'both']:
+            raise ValueError(f"Unsupported output format {output_format}. Use csv, parquet or both")
+        
+        output_path = output_file
+        if output_format in ['parquet', 'both']:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            # Type all-null columns (e.g. no emails found in a chunk) as strings so every part shares one schema
+            for i, field in enumerate(table.schema):
+                if pa.types.is_null(field.type):
+                    table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+            
+            partition = os.path.join(self.config['parquet_output_dir'], f"run_date={run_started.strftime('%Y-%m-%d')}")
+            os.makedirs(partition, exist_ok=True)
+            pq.write_table(table, os.path.join(
+                partition, f"enriched_leads_{run_started.strftime('%Y%m%d_%H%M%S')}_{part:05d}.parquet"
+            ), compression='zstd')
+            output_path = partition
+        
+        if output_format in ['csv', 'both']:
+            df.to_csv(output_file, index=False, mode='a' if part else 'w', header=not part)
+            output_path = output_file
+        return output_path
+    
+    def _process_streaming(self, file_path: str, output_file: str, chunksize: int, skip_processed: bool = True,
+                           run_started: datetime = None) -> str:
+        """Run the pipeline chunk by chunk, appending each chunk to the output"""
+        run_started = run_started or datetime.now()
+        output_path = output_file
+        total = 0
+        parts = 0
+        columns = None
+        run_results = {}
+        for enriched_chunk in self.iter_enriched_chunks(file_path, chunksize, skip_processed):
+            with self.metrics.stage('sync') as stage:
+                chunk_results = self.sync_all(enriched_chunk)
+                stage['rows'] = len(enriched_chunk)
+            
+            # Sum the per-destination results over chunks; any failed chunk marks the destination
+            for destination, result in chunk_results.items():
+                if destination not in run_results:
+                    run_results[destination] = dict(result)
+                else:
+                    summary = run_results[destination]
+                    for field in ['synced', 'failed', 'errors', 'duration']:
+                        summary[field] += result[field]
+                    if result['status'] != 'ok':
+                        summary['status'], summary['error'] = result['status'], result['error']
+            self._mark_processed(enriched_chunk, chunk_results)
+            
+            # The first chunk fixes the output columns
+            with self.metrics.stage('output') as stage:
+                if columns is None:
+                    columns = list(enriched_chunk.columns)
+                    output_path = self._write_output(enriched_chunk, output_file, run_started)
+                else:
+                    self._write_output(enriched_chunk.reindex(columns=columns), output_file, run_started, part=parts)
+                stage['rows'] = len(enriched_chunk)
+            parts += 1
+            total += len(enriched_chunk)
+        
+        if columns is None and self.config['output_format'] != 'parquet':
+            pd.DataFrame().to_csv(output_file, index=False)
+        self.sync_results = run_results
+        
+        logger.info(f"Processed {total} leads in chunks of {chunksize}, saved to {output_path}")
+        return output_path
+
+
+def _load_and_clean_file(config: Dict, file_path: str, run_started: datetime = None) -> tuple:
+    """(raw row count, cleaned leads tagged with source_file) for one batch input
+    
+    Module level so it can run in a process pool.
+    """
+    processor = LeadProcessor()
+    processor.config.update(config)
+    processor.run_started = run_started
+    raw_df = processor.load_retran_data(file_path)
+    cleaned_df = processor.clean_and_standardize(raw_df)
+    cleaned_df['source_file'] = pd.Categorical([os.path.basename(file_path)] * len(cleaned_df))
+    return len(raw_df), cleaned_df
 
 
 if __name__ == "__main__":
-    # Example usage
+    parser = argparse.ArgumentParser(description="Enrich Retran foreclosure leads and sync them to the marketing platforms")
+    parser.add_argument('inputs', nargs='*', default=['retran_download_today.csv'],
+                        help="Retran file, or several files, directories or glob patterns to process as one batch")
+    parser.add_argument('--output', help="CSV output path (default: enriched_leads_<timestamp>.csv)")
+    parser.add_argument('--workers', type=int, help="Processes loading batch inputs (default: BATCH_WORKERS)")
+    parser.add_argument('--watch', metavar='DIR', help="Run as a daemon, processing Retran files as they land in DIR")
+    args = parser.parse_args()
+    
     processor = LeadProcessor()
     
-    # Process today's Retran download
-    input_file = "retran_download_today.csv"  # Replace with actual file path
-    output_file = processor.process_daily_leads(input_file)
+    if args.watch:
+        # Stop after the current file on SIGTERM or Ctrl-C
+        stop = threading.Event()
+        for signum in [signal.SIGTERM, signal.SIGINT]:
+            signal.signal(signum, lambda signum, frame: stop.set())
+        processor.watch(args.watch, stop=stop)
+        sys.exit(0)
+    
+    if len(args.inputs) == 1 and os.path.isfile(args.inputs[0]):
+        # Process today's Retran download
+        output_file = processor.process_daily_leads(args.inputs[0], output_file=args.output,
+                                                    chunksize=processor.config['chunk_size'] or None)
+    else:
+        # Several county downloads: load them in parallel, then enrich and sync once
+        output_file = processor.process_batch(args.inputs, output_file=args.output, workers=args.workers)
     
-    print(f"Processing complete! Output saved to: {output_file}")
\ No newline at end of file
+    print(f"Processing complete! Output saved to: {output_file}")
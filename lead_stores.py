@@ -0,0 +1,436 @@
+"""SQLite-backed state shared by LeadProcessor runs
+
+Each store keeps one WAL-mode connection that worker threads share under
+a lock. Lookups that take many keys at once join against a temp table.
+"""
+import numpy as np
+import pandas as pd
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteStore:
+    """One shared SQLite connection with the pragmas and schema every store uses
+    
+    Subclasses list their CREATE statements in SCHEMA. All access to
+    self.conn goes through self.lock.
+    """
+    
+    SCHEMA: List[str] = []
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in self.SCHEMA:
+            self.conn.execute(statement)
+        self.conn.commit()
+    
+    @contextmanager
+    def _temp_table(self, name: str, columns: str, rows: Iterable[tuple]):
+        """Fill a temp table with rows for the duration of the block
+        
+        Lookups join against it so they use the primary key index instead
+        of one query per key. Call with self.lock held.
+        """
+        self.conn.execute(f'CREATE TEMP TABLE IF NOT EXISTS {name} ({columns})')
+        self.conn.execute(f'DELETE FROM {name}')
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is not None:
+            placeholders = ','.join('?' * len(first))
+            self.conn.execute(f'INSERT OR REPLACE INTO {name} VALUES ({placeholders})', first)
+            self.conn.executemany(f'INSERT OR REPLACE INTO {name} VALUES ({placeholders})', rows)
+        try:
+            yield
+        finally:
+            self.conn.execute(f'DELETE FROM {name}')
+            self.conn.commit()
+    
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+class LeadIndex(SQLiteStore):
+    """On-disk index of leads already sent to the paid stages
+    
+    Keyed on the lead_key built by clean_and_standardize. A fingerprint of
+    the remaining lead fields is stored alongside, so a lead whose phone,
+    sale date or loan amount changed is treated as new again.
+    """
+    
+    FINGERPRINT_COLUMNS = ['phone', 'city', 'state', 'zip', 'foreclosure_date', 'loan_amount']
+    
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS leads ('
+        'lead_key INTEGER PRIMARY KEY, fingerprint INTEGER NOT NULL, '
+        'first_seen TEXT NOT NULL, last_seen TEXT NOT NULL) WITHOUT ROWID'
+    ]
+    
+    def fingerprints(self, df: pd.DataFrame) -> np.ndarray:
+        """Stable int64 hash of the non-key lead fields"""
+        columns = [col for col in self.FINGERPRINT_COLUMNS if col in df.columns]
+        if not columns:
+            return np.zeros(len(df), dtype='int64')
+        # Render compact dtypes as the ISO text Retran exports, so fingerprints match those stored before
+        values = pd.DataFrame({col: self._fingerprint_text(df[col]) for col in columns})
+        return pd.util.hash_pandas_object(values, index=False, categorize=False).to_numpy().view('int64')
+    
+    @staticmethod
+    def _fingerprint_text(values: pd.Series) -> pd.Series:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime('%Y-%m-%d')
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(values.cat.categories.dtype)
+        elif pd.api.types.is_float_dtype(values):
+            values = values.astype('float64')
+        return values.astype(str)
+    
+    def _sorted_rows(self, df: pd.DataFrame) -> List[tuple]:
+        """(lead_key, fingerprint) pairs in key order, so B-tree writes stay local"""
+        keys = df['lead_key'].to_numpy(dtype='int64')
+        fingerprints = self.fingerprints(df)
+        order = np.argsort(keys, kind='stable')
+        return list(zip(keys[order].tolist(), fingerprints[order].tolist()))
+    
+    def filter_new(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return only the leads that are not in the index or have changed"""
+        if df.empty:
+            return df
+        
+        pending = self._sorted_rows(df)
+        with self.lock, self._temp_table('pending', 'lead_key INTEGER PRIMARY KEY, fingerprint INTEGER', pending):
+            known = {row[0] for row in self.conn.execute(
+                'SELECT p.lead_key FROM pending p JOIN leads l '
+                'ON l.lead_key = p.lead_key AND l.fingerprint = p.fingerprint'
+            )}
+        
+        new_df = df[~df['lead_key'].isin(known).values]
+        logger.info(f"Lead index: {len(new_df)} new or changed, {len(df) - len(new_df)} already processed")
+        return new_df
+    
+    def mark_processed(self, df: pd.DataFrame):
+        """Record leads as processed so later runs skip them"""
+        if df.empty:
+            return
+        
+        now = datetime.now().isoformat()
+        rows = [(key, fp, now, now) for key, fp in self._sorted_rows(df)]
+        with self.lock:
+            self.conn.executemany(
+                'INSERT INTO leads VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(lead_key) DO UPDATE SET fingerprint = excluded.fingerprint, last_seen = excluded.last_seen',
+                rows
+            )
+            self.conn.commit()
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM leads').fetchone()[0]
+
+
+class EnrichmentCache(SQLiteStore):
+    """Persistent TTL/LRU cache in front of the enrichment APIs
+    
+    Entries live in SQLite with a per-provider TTL; empty results are cached
+    too, under a shorter negative TTL. A small in-memory LRU sits in front
+    of the table so repeat lookups within a process skip SQLite entirely.
+    When the table grows past max_entries the least recently used entries
+    are evicted.
+    
+    Disk hits only queue their accessed_at update. The queue is written and
+    committed by the next set(), by close(), or once touch_batch entries
+    build up. A read therefore never leaves a write transaction open to
+    block other processes sharing the file.
+    """
+    
+    MISS = object()
+    
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS cache ('
+        'provider TEXT NOT NULL, key TEXT NOT NULL, value TEXT, '
+        'stored_at REAL NOT NULL, accessed_at REAL NOT NULL, '
+        'PRIMARY KEY (provider, key)) WITHOUT ROWID',
+        'CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)',
+    ]
+    
+    def __init__(self, path: str, ttls: Dict[str, int], negative_ttl: int,
+                 max_entries: int = 1000000, memory_entries: int = 10000, touch_batch: int = 500):
+        super().__init__(path)
+        self.ttls = ttls
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()
+        self.stats = {}
+        self.touch_batch = touch_batch
+        self._touched = {}
+        self._writes = 0
+    
+    def _ttl(self, provider: str, value) -> int:
+        return self.ttls.get(provider, 0) if value else self.negative_ttl
+    
+    def _count(self, provider: str, outcome: str):
+        counters = self.stats.setdefault(provider, {'hits': 0, 'misses': 0, 'negative_hits': 0})
+        counters[outcome] += 1
+    
+    def _remember(self, provider: str, key: str, value, stored_at: float):
+        self.memory[(provider, key)] = (value, stored_at)
+        self.memory.move_to_end((provider, key))
+        if len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+    
+    def get(self, provider: str, key: str):
+        """Cached value for key, or EnrichmentCache.MISS"""
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get((provider, key))
+            if entry is None:
+                row = self.conn.execute(
+                    'SELECT value, stored_at FROM cache WHERE provider = ? AND key = ?', (provider, key)
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+                    self._touched[(provider, key)] = now
+                    if len(self._touched) >= self.touch_batch:
+                        self._flush_touched()
+                        self.conn.commit()
+                    self._remember(provider, key, *entry)
+            else:
+                self.memory.move_to_end((provider, key))
+            
+            if entry is None or now - entry[1] > self._ttl(provider, entry[0]):
+                self._count(provider, 'misses')
+                return self.MISS
+            
+            self._count(provider, 'hits' if entry[0] else 'negative_hits')
+            return entry[0]
+    
+    def set(self, provider: str, key: str, value):
+        """Store a lookup result; None or {} is cached as a negative result"""
+        now = time.time()
+        with self.lock:
+            self._remember(provider, key, value, now)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)',
+                (provider, key, json.dumps(value), now, now)
+            )
+            self._touched.pop((provider, key), None)
+            self._flush_touched()
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict()
+            self.conn.commit()
+    
+    def _flush_touched(self):
+        """Write queued accessed_at updates; the caller holds the lock and commits"""
+        if self._touched:
+            self.conn.executemany(
+                'UPDATE cache SET accessed_at = ? WHERE provider = ? AND key = ?',
+                [(accessed_at, provider, key) for (provider, key), accessed_at in self._touched.items()]
+            )
+            self._touched = {}
+    
+    def _evict(self):
+        """Drop least recently used entries down to 90% of max_entries"""
+        count = self.conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * 0.9)
+        self.conn.execute(
+            'DELETE FROM cache WHERE (provider, key) IN '
+            '(SELECT provider, key FROM cache ORDER BY accessed_at LIMIT ?)', (excess,)
+        )
+        self.memory.clear()
+        logger.info(f"Enrichment cache evicted {excess} entries")
+    
+    def close(self):
+        with self.lock:
+            self._flush_touched()
+            self.conn.commit()
+            self.conn.close()
+
+
+class SendLedger(SQLiteStore):
+    """Durable record of SMS sends keyed by phone + campaign
+    
+    Each send is committed as soon as Twilio accepts (or permanently rejects)
+    it, so a crashed run can be restarted without re-texting anyone.
+    """
+    
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS sends ('
+        'phone TEXT NOT NULL, campaign TEXT NOT NULL, status TEXT NOT NULL, '
+        'sid TEXT, error TEXT, sent_at TEXT NOT NULL, '
+        'PRIMARY KEY (phone, campaign)) WITHOUT ROWID'
+    ]
+    
+    def already_sent(self, phones: List[str], campaign: str) -> Set[str]:
+        """Phones with a recorded send for campaign"""
+        sent = set()
+        with self.lock:
+            for start in range(0, len(phones), 500):
+                batch = phones[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                sent.update(row[0] for row in self.conn.execute(
+                    f'SELECT phone FROM sends WHERE campaign = ? AND phone IN ({placeholders})',
+                    [campaign] + batch
+                ))
+        return sent
+    
+    def record(self, phone: str, campaign: str, status: str, sid: str = None, error: str = None):
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO sends VALUES (?, ?, ?, ?, ?, ?)',
+                (phone, campaign, status, sid, error, datetime.now().isoformat())
+            )
+            self.conn.commit()
+
+
+class AudienceStore(SQLiteStore):
+    """Persistent ad audiences and the members already uploaded to them
+    
+    Lets the ad platform syncs reuse one audience across runs and upload
+    only the delta: members not uploaded yet, and optionally removals for
+    members no longer present.
+    """
+    
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS audiences ('
+        'destination TEXT PRIMARY KEY, audience_id TEXT NOT NULL, created_at TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS members ('
+        'destination TEXT NOT NULL, audience_id TEXT NOT NULL, member_key TEXT NOT NULL, '
+        'identifiers TEXT NOT NULL, uploaded_at TEXT NOT NULL, '
+        'PRIMARY KEY (destination, audience_id, member_key)) WITHOUT ROWID',
+    ]
+    
+    def get_audience(self, destination: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT audience_id FROM audiences WHERE destination = ?', (destination,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set_audience(self, destination: str, audience_id: str):
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO audiences VALUES (?, ?, ?)',
+                (destination, audience_id, datetime.now().isoformat())
+            )
+            self.conn.commit()
+    
+    def diff(self, destination: str, audience_id: str, members: Dict[str, Dict],
+             include_removals: bool = False) -> tuple:
+        """Split members into (keys to add, {key: identifiers} to remove)"""
+        with self.lock, self._temp_table('current_members', 'member_key TEXT PRIMARY KEY',
+                                         ((key,) for key in members)):
+            uploaded = {row[0] for row in self.conn.execute(
+                'SELECT c.member_key FROM current_members c JOIN members m '
+                'ON m.destination = ? AND m.audience_id = ? AND m.member_key = c.member_key',
+                (destination, audience_id)
+            )}
+            removals = {}
+            if include_removals:
+                removals = {row[0]: json.loads(row[1]) for row in self.conn.execute(
+                    'SELECT member_key, identifiers FROM members WHERE destination = ? AND audience_id = ? '
+                    'AND member_key NOT IN (SELECT member_key FROM current_members)',
+                    (destination, audience_id)
+                )}
+        return [key for key in members if key not in uploaded], removals
+    
+    def add_members(self, destination: str, audience_id: str, members: Dict[str, Dict]):
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO members VALUES (?, ?, ?, ?, ?)',
+                ((destination, audience_id, key, json.dumps(identifiers), now) for key, identifiers in members.items())
+            )
+            self.conn.commit()
+    
+    def remove_members(self, destination: str, audience_id: str, keys: List[str]):
+        with self.lock:
+            self.conn.executemany(
+                'DELETE FROM members WHERE destination = ? AND audience_id = ? AND member_key = ?',
+                ((destination, audience_id, key) for key in keys)
+            )
+            self.conn.commit()
+
+
+class MatchKeyCache(SQLiteStore):
+    """Content-addressed cache of hashed match keys
+    
+    Keyed on a 64-bit hash of the normalized inputs, so a lead whose email,
+    phone and name are unchanged skips hashing on later runs.
+    """
+    
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS match_keys ('
+        'content_key INTEGER PRIMARY KEY, email_sha256 TEXT, phone_sha256 TEXT, '
+        'fn_sha256 TEXT, ln_sha256 TEXT, email_md5 TEXT) WITHOUT ROWID'
+    ]
+    
+    def lookup(self, keys: np.ndarray) -> Dict[int, tuple]:
+        """Cached hashes for the given content keys"""
+        if len(keys) == 0:
+            return {}
+        unique_keys = np.unique(keys).tolist()
+        with self.lock, self._temp_table('wanted', 'content_key INTEGER PRIMARY KEY',
+                                         ((key,) for key in unique_keys)):
+            return {row[0]: row[1:] for row in self.conn.execute(
+                'SELECT m.* FROM wanted w JOIN match_keys m ON m.content_key = w.content_key'
+            )}
+    
+    def store(self, keys: List[int], hashes: List[tuple]):
+        rows = sorted((key,) + tuple(row) for key, row in zip(keys, hashes))
+        with self.lock:
+            self.conn.executemany('INSERT OR REPLACE INTO match_keys VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.conn.commit()
+
+
+class SeenKeys(SQLiteStore):
+    """Dedupe keys of the leads kept so far in one streaming run
+    
+    The default path '' opens a private temporary database, which SQLite
+    keeps on disk beyond a small page cache and deletes on close, so the
+    keys of a whole file never have to fit in memory.
+    """
+    
+    SCHEMA = ['CREATE TABLE IF NOT EXISTS seen (dedupe_key INTEGER PRIMARY KEY) WITHOUT ROWID']
+    
+    def __init__(self, path: str = ''):
+        super().__init__(path)
+    
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Mask of the keys already added"""
+        if len(keys) == 0:
+            return np.zeros(0, dtype=bool)
+        unique_keys = np.unique(keys).tolist()
+        with self.lock, self._temp_table('wanted', 'dedupe_key INTEGER PRIMARY KEY',
+                                         ((key,) for key in unique_keys)):
+            found = [row[0] for row in self.conn.execute(
+                'SELECT w.dedupe_key FROM wanted w JOIN seen s ON s.dedupe_key = w.dedupe_key'
+            )]
+        return np.isin(keys, np.array(found, dtype='int64'))
+    
+    def add(self, keys: np.ndarray):
+        rows = ((key,) for key in np.unique(keys).tolist())
+        with self.lock:
+            self.conn.executemany('INSERT OR IGNORE INTO seen VALUES (?)', rows)
+            self.conn.commit()
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
@@ -0,0 +1,56 @@
+"""Regression checks for LeadDeduper near-duplicate matching
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from lead_processor import LeadDeduper
+
+
+def _survivors(addresses, names):
+    deduper = LeadDeduper()
+    normalized, streets = deduper.normalize_addresses(pd.Series(addresses))
+    owners = deduper.normalize_names(pd.Series(names))
+    duplicates = deduper.near_duplicates(normalized, owners, streets, np.full(len(addresses), '90001', dtype=object),
+                                         np.ones(len(addresses), dtype=bool))
+    return np.flatnonzero(~duplicates).tolist()
+
+
+@pytest.fixture(params=['arrow', 'python'])
+def engine(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(LeadDeduper, '_use_arrow', staticmethod(lambda: False))
+    return request.param
+
+
+def test_units_stay_distinct(engine):
+    addresses = ['100 Oak Ave Apt 1', '100 Oak Ave Apt 2', '100 Oak Ave #3', '100 Oak Ave Unit 1']
+    assert _survivors(addresses, ['Jane Doe'] * 4) == [0, 1, 2]
+
+
+def test_different_first_names_stay_distinct(engine):
+    assert _survivors(['12 Elm St', '12 Elm Street'], ['Joan Smith', 'John Smith']) == [0, 1]
+
+
+def test_spelling_variants_collapse(engine):
+    addresses = ['123 Main St', '123 Main Street', '123 N Main St', '123 Main St Apt 4', '123 Main St #4']
+    names = ['John Smith', 'SMITH JOHN', 'Jon Smith', 'John A Smith', 'John Smith']
+    assert _survivors(addresses, names) == [0, 3]
+
+
+def test_persistent_blocks_are_bounded():
+    deduper = LeadDeduper(persistent=True, max_blocks=2)
+    for house in range(5):
+        normalized, streets = deduper.normalize_addresses(pd.Series([f"{house} Pine Rd"]))
+        deduper.near_duplicates(normalized, deduper.normalize_names(pd.Series(['Jane Doe'])), streets,
+                                np.array(['90001'], dtype=object), np.ones(1, dtype=bool))
+    assert list(deduper.blocks) == ['90001|3|pine|', '90001|4|pine|']
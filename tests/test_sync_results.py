@@ -0,0 +1,159 @@
+"""Regression checks for sync_all statuses and the lead index they gate
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from lead_processor import LeadProcessor
+
+
+class _Response:
+    def __init__(self, status_code: int, payload: dict = None, text: str = None):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = json.dumps(payload) if text is None else text
+        self.content = self.text.encode()
+
+    def json(self):
+        if self.payload is None:
+            raise ValueError('Expecting value')
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+def _leads() -> pd.DataFrame:
+    return pd.DataFrame({
+        'lead_key': [101, 202],
+        'owner_name': ['Jane Doe', 'John Roe'],
+        'email': ['jane@example.com', 'john@example.com'],
+        'phone': ['5555550101', '5555550202'],
+    })
+
+
+def _facebook_processor(tmp_path, rejected_batches) -> LeadProcessor:
+    """A processor whose Facebook uploads fail for the given batch_seq values"""
+    processor = LeadProcessor()
+    processor.config.update(
+        lead_index_path=str(tmp_path / 'lead_index.sqlite3'),
+        audience_store_path=str(tmp_path / 'audiences.sqlite3'),
+        facebook_access_token='test',
+        facebook_batch_size=1,
+        facebook_max_retries=1,
+        facebook_upload_workers=1,
+    )
+
+    def http(provider, method, url, **kwargs):
+        if url.endswith('/customaudiences'):
+            return _Response(200, {'id': 'audience-1'})
+        if kwargs['json']['session']['batch_seq'] in rejected_batches:
+            return _Response(400, {'error': {'message': 'Invalid parameter'}})
+        return _Response(200, {'num_received': 1})
+
+    processor._http = http
+    return processor
+
+
+def test_partly_rejected_sync_is_partial_and_not_marked(tmp_path):
+    processor = _facebook_processor(tmp_path, rejected_batches={1})
+    leads = _leads()
+    results = processor.sync_all(leads, destinations=['facebook_ads'])
+    assert results['facebook_ads']['status'] == 'partial'
+    assert (results['facebook_ads']['synced'], results['facebook_ads']['failed']) == (1, 1)
+
+    processor._mark_processed(leads, results)
+    assert len(processor.lead_index) == 0
+    assert len(processor.lead_index.filter_new(leads)) == 2
+
+
+def test_rerun_sends_the_rejected_lead_and_marks_both(tmp_path):
+    leads = _leads()
+    first = _facebook_processor(tmp_path, rejected_batches={1})
+    first._mark_processed(leads, first.sync_all(leads, destinations=['facebook_ads']))
+    first.audience_store.close()
+    first.lead_index.close()
+
+    rerun = _facebook_processor(tmp_path, rejected_batches=set())
+    results = rerun.sync_all(leads, destinations=['facebook_ads'])
+    assert results['facebook_ads']['status'] == 'ok'
+    assert (results['facebook_ads']['synced'], results['facebook_ads']['failed']) == (1, 0)
+
+    rerun._mark_processed(leads, results)
+    assert len(rerun.lead_index) == 2
+
+
+def test_non_json_twilio_rejection_fails_only_that_number(tmp_path):
+    processor = LeadProcessor()
+    processor.config.update(
+        twilio_account_sid='ACtest',
+        twilio_auth_token='test',
+        send_ledger_path=str(tmp_path / 'ledger.sqlite3'),
+        twilio_workers=1,
+    )
+
+    def http(provider, method, url, **kwargs):
+        if kwargs['data']['To'] == '5555550101':
+            return _Response(403, text='<html><body>Forbidden</body></html>')
+        return _Response(201, {'sid': 'SM1'})
+
+    processor._http = http
+    results = processor.sync_all(_leads(), destinations=['twilio'])
+    assert results['twilio']['status'] == 'partial'
+    assert (results['twilio']['synced'], results['twilio']['failed']) == (1, 1)
+    assert processor.sync_errors['twilio'][0]['error'] == '<html><body>Forbidden</body></html>'
+
+
+def test_timed_out_destination_is_not_started_again(tmp_path):
+    processor = LeadProcessor()
+    processor.config.update(twilio_account_sid='ACtest', twilio_sync_timeout=0.2)
+    release = threading.Event()
+    calls = []
+
+    def sync_to_twilio(df):
+        calls.append(len(df))
+        release.wait(5)
+        processor.sync_counts['twilio'] = {'synced': len(df), 'failed': 0}
+        return True
+
+    processor.sync_to_twilio = sync_to_twilio
+    try:
+        assert processor.sync_all(_leads(), destinations=['twilio'])['twilio']['status'] == 'timeout'
+        second = processor.sync_all(_leads(), destinations=['twilio'])['twilio']
+        assert (second['status'], second['error']) == ('timeout', 'previous sync still running')
+        assert calls == [2]
+    finally:
+        release.set()
+    processor._sync_threads['twilio'].join(5)
+    assert processor.sync_all(_leads(), destinations=['twilio'])['twilio']['status'] == 'ok'
+    assert calls == [2, 2]
+
+
+def test_unreadable_mailchimp_results_leave_the_batch_unconfirmed(tmp_path):
+    processor = LeadProcessor()
+    processor.config.update(mailchimp_api_key='test', mailchimp_batch_size=1, mailchimp_poll_interval=0)
+    batch_ids = iter(['batch-1', 'batch-2'])
+
+    def http(provider, method, url, **kwargs):
+        if url.endswith('/batches'):
+            return _Response(200, {'id': next(batch_ids)})
+        if url.endswith('/batches/batch-1'):
+            return _Response(200, {'status': 'finished', 'errored_operations': 1,
+                                   'response_body_url': 'https://results.example/batch-1.tar.gz'})
+        if url.endswith('/batches/batch-2'):
+            return _Response(200, {'status': 'finished', 'errored_operations': 0})
+        return _Response(200, text='not a tarball')
+
+    processor._http = http
+    result = processor.sync_all(_leads(), destinations=['mailchimp'])['mailchimp']
+    assert (result['status'], result['synced'], result['failed']) == ('partial', 1, 1)